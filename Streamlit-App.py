@@ -3,203 +3,302 @@
 # Batch-Abruf | robust gegen Yahoo-Limits | saubere Multi-Index-Behandlung
 # ───────────────────────────────────────────────────────────────
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import json, os, datetime, time, warnings
+import datetime, io, warnings
+from contextlib import nullcontext
 warnings.filterwarnings("ignore", category=RuntimeWarning)
 
-OVERRIDE_FILE   = "dividend_overrides.json"
+from dividend_engine import (CHANGE_SPANS, analyze_portfolio, derive, find_override, fmt_eur,
+                             iter_tickers, raws_for_overrides, results_frame, yield_history)
+from override_store import OVERRIDES
+from perf_stats import RunStats, format_summary
+from prefetch_scheduler import PrefetchScheduler, config_tickers, prefetch_enabled
+from result_export import (SNAPSHOT_DIR, ExportError, append_snapshot, export_rows,
+                           load_snapshots, snapshot_files)
+from screener import TOP_K, screen
+from symbol_index import SYMBOLS
+
 DEFAULT_TICKERS = (
     "VOW3.DE, INGA.AS, LHA.DE, VICI, KMI, O, ENB, ALV.DE, MC.PA"
 )
 
-# optionale Kurzformen
-TICKER_MAP = {"WCH": "WCH.DE", "LVMH": "MC.PA"}
+# WKN, ISIN und Kurzformen (z.B. LVMH) löst der Offline-Symbolindex auf;
+# unbekannte WKN/ISIN ergeben None
+norm = SYMBOLS.resolve
 
-norm = lambda t: TICKER_MAP.get(t.upper(), t.upper())
+# Standard-Ticker im Hintergrund aktuell halten – nur mit DIVIDENDEN_PREFETCH=1
+BACKGROUND_PREFETCH = prefetch_enabled()
 
-# ───────── Datei-Helfer ────────────────────────────────────────
-def load_overrides():
-    if os.path.exists(OVERRIDE_FILE):
-        try:
-            return json.load(open(OVERRIDE_FILE, encoding="utf-8"))
-        except Exception:
-            pass
-    return {}
-
-def save_overrides(d):
-    json.dump(d, open(OVERRIDE_FILE, "w", encoding="utf-8"),
-              ensure_ascii=False, indent=2)
-
-# ───────── Yahoo-Helfer ───────────────────────────────────────
-@st.cache_data(ttl=3600)
-def fx(src, dst="EUR"):
-    if src == dst:
-        return 1.0
-    pair = f"{src}{dst}=X"
-    try:
-        return float(yf.Ticker(pair).history("1d")["Close"].iloc[-1])
-    except Exception:
-        return 1.0
-
-def safe_info(tkr_obj, pause=1.2, tries=3):
-    for _ in range(tries):
-        data = tkr_obj.get_info()
-        if data:
-            return data
-        time.sleep(pause)
-    return {}
-
-# ───────── Prozent-Berechnung ─────────────────────────────────
-def pct_from_series(series: pd.Series) -> list[str]:
-    if series.empty or len(series) < 2:
-        return ["N/A"] * 4
-    latest = series.iloc[-1]
-    spans  = [1, 7, 30, 365]
-    out    = []
-    for d in spans:
-        tgt  = series.index[-1] - pd.Timedelta(days=d)
-        idx  = series.index.get_indexer([tgt], method="bfill")[0]
-        past = series.iloc[idx]
-        if past <= 0:
-            out.append("N/A"); continue
-        pct = (latest - past) / past * 100
-        out.append("0,0" if abs(pct) < .05
-                   else f"{pct:.1f}".replace('.', ',').lstrip('+'))
+def prefetch_tickers():
+    return config_tickers() or [norm(t) for t in DEFAULT_TICKERS.split(",")]
+
+@st.cache_resource
+def background_prefetch():
+    # ohne Argumente: genau ein Scheduler je Server-Prozess; config.txt liest er selbst neu
+    return PrefetchScheduler(source=prefetch_tickers).start()
+
+# ───────── Anzeige-Helfer ─────────────────────────────────────
+def fmt_change(val) -> str:
+    if pd.isna(val):
+        return "N/A"
+    return "0,0" if abs(val) < .05 else f"{val:.1f}".replace('.', ',')
+
+# Beträge bleiben numerisch (sortierbar), formatiert wird nur die Anzeige
+COLUMN_CONFIG = {
+    "Kurs (€)":              st.column_config.NumberColumn(format="€ %.2f"),
+    "Jahresdividende (€)":   st.column_config.NumberColumn(format="€ %.2f"),
+    "Dividendenrendite (%)": st.column_config.NumberColumn(format="%.2f"),
+}
+
+def render_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Numerische Veränderungen erst für die Anzeige zu „T/W/M/J“ formatieren."""
+    spans = list(CHANGE_SPANS)
+    out = df.drop(columns=spans + ["Override", "Fehler"])
+    out.insert(out.columns.get_loc("Stand"), "Veränderung T/W/M/J",
+               df[spans].apply(lambda c: c.map(fmt_change)).agg("/".join, axis=1))
     return out
 
-def day_change(val):
-    if isinstance(val, str) and "/" in val:
-        try:
-            return float(val.split("/")[0].replace(",", "."))
-        except ValueError:
-            pass
-    return float("-inf")
+def rederive(tickers):
+    """Nur die Zeilen der betroffenen Ticker neu berechnen – ohne Netzabruf."""
+    res = st.session_state.res
+    if res is None:
+        return
+    # Schlüssel können WKN/ISIN/Alias sein – Zuordnung wie beim Anwenden der Overrides
+    for raw in raws_for_overrides(st.session_state.raws.values(), tickers):
+        row = results_frame([derive(raw, find_override(OVERRIDES.values(), raw))])
+        res.loc[res["Ticker"] == raw["ticker"], row.columns] = row.iloc[0].values
+
+BAND_CONFIG = {
+    "Aktuell (%)": st.column_config.NumberColumn(format="%.2f"),
+    "P10 (%)":     st.column_config.NumberColumn(format="%.2f"),
+    "P50 (%)":     st.column_config.NumberColumn(format="%.2f"),
+    "P90 (%)":     st.column_config.NumberColumn(format="%.2f"),
+    "Perzentil":   st.column_config.ProgressColumn(format="%.0f", min_value=0, max_value=100),
+}
+
+def show_yield_history():
+    """Rollierende 12-Monats-Rendite: Bänder aller Ticker plus Verlauf eines Tickers."""
+    if st.session_state.yhist is None:
+        with st.spinner("Renditeverlauf wird berechnet …"):
+            st.session_state.yhist = yield_history(list(st.session_state.raws.values()))
+    ttm, yld, bands = st.session_state.yhist
+    if yld.empty:
+        st.info("Keine Kurshistorie für den Renditeverlauf vorhanden.")
+        return
+    st.caption("Perzentil = Anteil der Tage im Zeitraum mit niedrigerer oder gleicher Rendite als heute")
+    st.dataframe(bands.sort_values("Perzentil", ascending=False), column_config=BAND_CONFIG,
+                 use_container_width=True)
+    t = st.selectbox("Verlauf für", list(yld.columns))
+    b = bands.loc[t]
+    chart = pd.DataFrame({"Rendite (%)": yld[t]})
+    for col in ("P10 (%)", "P50 (%)", "P90 (%)"):
+        chart[col] = b[col]
+    st.line_chart(chart)
+    st.line_chart(ttm[t].rename("12-Monats-Dividende (€)"))
+
+EXPORT_CHOICES = {
+    "CSV (Semikolon, Dezimalkomma)": ("csv", "de", "text/csv"),
+    "CSV (Komma, Dezimalpunkt)":     ("csv", "en", "text/csv"),
+    "Parquet":                       ("parquet", "de", "application/octet-stream"),
+    "Excel (XLSX)":                  ("xlsx", "de",
+                                      "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+def current_rows():
+    """Ergebniszeilen des letzten Laufs mit den aktuellen Overrides."""
+    ovr = OVERRIDES.values()
+    return (derive(r, find_override(ovr, r)) for r in st.session_state.raws.values())
+
+def show_export():
+    """Export der Ergebnisse; die Datei wird erst auf Anforderung blockweise erzeugt."""
+    with st.expander("Export"):
+        e1, e2 = st.columns([3, 1])
+        choice = e1.selectbox("Format", list(EXPORT_CHOICES), label_visibility="collapsed")
+        fmt, dialect, mime = EXPORT_CHOICES[choice]
+        if e2.button("Datei erstellen", use_container_width=True):
+            buf = io.BytesIO()
+            try:
+                export_rows(current_rows(), buf, fmt, dialect)
+            except ExportError as e:
+                st.error(str(e))
+            else:
+                stamp = pd.Timestamp.now().strftime("%Y-%m-%d_%H-%M-%S")
+                st.session_state.export = (f"dividendenrendite_{stamp}.{fmt}", buf.getvalue(), mime)
+        if st.session_state.export:
+            name, data, mime = st.session_state.export
+            st.download_button(f"⬇️ {name} herunterladen", data, file_name=name, mime=mime)
+        show_run_history()
+
+# Zeitfenster des gespeicherten Renditeverlaufs (Tage)
+RUN_HISTORY_WINDOWS = {"30 Tage": 30, "90 Tage": 90, "1 Jahr": 365}
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def run_history(files, tickers, since):
+    """Gespeicherte Läufe im Fenster; `files` nur als Cache-Schlüssel (neuer Lauf → neu lesen)."""
+    return load_snapshots(tickers=list(tickers), since=since, columns=("yield_pct",))
+
+def show_run_history():
+    """Renditeverlauf der gespeicherten Läufe – nur auf Anforderung und für ein begrenztes Fenster."""
+    if not st.toggle("Gespeicherte Läufe anzeigen"):
+        return
+    window = st.selectbox("Zeitraum", list(RUN_HISTORY_WINDOWS))
+    since = datetime.date.today() - datetime.timedelta(days=RUN_HISTORY_WINDOWS[window])
+    files = tuple(snapshot_files(since=since))
+    if not files:
+        st.caption(f"Keine gespeicherten Läufe in {SNAPSHOT_DIR}/ seit {since:%d.%m.%Y}.")
+        return
+    st.caption(f"Renditeverlauf: {len(files)} gespeicherte Läufe in {SNAPSHOT_DIR}/")
+    try:
+        hist = run_history(files, tuple(sorted(st.session_state.raws)), since)
+    except ExportError as e:
+        st.info(str(e))
+        return
+    if hist["run"].nunique() > 1:
+        st.line_chart(hist.pivot_table(index="run", columns="ticker", values="yield_pct"))
+
+def show_perf(stats: RunStats):
+    """Aufklappbares Performance-Panel zum letzten Lauf."""
+    s = stats.summary()
+    with st.expander("Performance"):
+        m = st.columns(4)
+        m[0].metric("Laufzeit", f"{s['wall_s']:.2f} s")
+        m[1].metric("Upstream-Aufrufe", s["calls"].get("total", 0))
+        hits = sum(c["hits"] for c in s["cache"].values())
+        total = hits + sum(c["misses"] for c in s["cache"].values())
+        m[2].metric("Cache-Treffer", f"{hits / total:.0%}" if total else "–")
+        m[3].metric("Wiederholungen", s["retries"], f"{s['retry_sleep_s']:.1f} s Pause", delta_color="off")
+        st.text(format_summary(s))
+        st.caption("Langsamste Ticker (Sekunden je Stufe)")
+        st.dataframe(pd.DataFrame(stats.slowest(15)), use_container_width=True, hide_index=True)
 
 # ───────── Streamlit-UI ───────────────────────────────────────
 st.set_page_config("Dividenden-Dashboard", layout="wide")
 st.title("📊 Dividenden-Dashboard")
 
-if "ovr" not in st.session_state:
-    st.session_state.ovr = load_overrides()
+if BACKGROUND_PREFETCH:
+    background_prefetch()
+
+# Overrides liegen nicht in der Sitzung: OVERRIDES teilt sie über alle Sitzungen
+# und liest die Datei nur nach Änderungen neu
 if "res" not in st.session_state:
     st.session_state.res = None
+if "raws" not in st.session_state:
+    st.session_state.raws = {}   # Ticker → Rohdaten (unabhängig von Overrides)
+if "perf" not in st.session_state:
+    st.session_state.perf = None  # RunStats des letzten Laufs
+if "yhist" not in st.session_state:
+    st.session_state.yhist = None  # (12M-Dividende, Rendite, Bänder) zum letzten Lauf
+if "export" not in st.session_state:
+    st.session_state.export = None  # (Dateiname, Inhalt, MIME) des letzten Exports
+if "edit" not in st.session_state:
+    st.session_state.edit = False  # Override-Formular offen
 
-raw  = st.text_input("Ticker (Komma getrennt)", DEFAULT_TICKERS)
-tick = [norm(t) for t in raw.split(",") if t.strip()]
+with st.expander("🔎 Symbolsuche (WKN, ISIN, Name, Ticker)"):
+    query = st.text_input("Suchbegriff", key="symq", placeholder="z.B. 8404, DE0007, Allianz, ALV")
+    if query.strip():
+        hits = SYMBOLS.prefix(query, limit=20)
+        if hits:
+            st.dataframe(pd.DataFrame(hits).rename(columns={"ticker": "Ticker", "name": "Name",
+                                                            "kind": "Treffer in", "key": "Schlüssel"}),
+                         use_container_width=True, hide_index=True)
+        else:
+            st.caption("Keine Treffer im Symbolindex.")
+
+raw  = st.text_input("Ticker, WKN oder ISIN (Komma getrennt)", DEFAULT_TICKERS)
+entries = {t.strip(): norm(t) for t in raw.split(",") if t.strip()}
+unknown = [t for t, symbol in entries.items() if symbol is None]
+if unknown:
+    st.warning(f"Nicht im Symbolindex gefunden (bitte Yahoo-Ticker angeben): {', '.join(unknown)}")
+tick = list(dict.fromkeys(symbol for symbol in entries.values() if symbol))
 
 c_run, c_edit, c_del = st.columns(3)
 do_run  = c_run.button("Analyse starten",    use_container_width=True)
 do_edit = c_edit.button("Dividende manuell", use_container_width=True)
 do_del  = c_del.button("Overrides löschen",  use_container_width=True)
+record  = st.checkbox(f"Lauf im Renditeverlauf speichern ({SNAPSHOT_DIR}/)", value=False)
 
 if do_del:
-    st.session_state.ovr = {}
-    if os.path.exists(OVERRIDE_FILE): os.remove(OVERRIDE_FILE)
-    st.session_state.res = None
-    st.experimental_rerun()
+    affected = list(OVERRIDES.values())
+    OVERRIDES.clear()
+    rederive(affected)
+    st.rerun()
 
 # ───────── Analyse ────────────────────────────────────────────
 if do_run and tick:
-    bulk = yf.download(
-        tick, period="400d", interval="1d",
-        group_by="ticker", auto_adjust=False, threads=False
-    )
-
-    # Close- und Dividenden-DFs robust erzeugen
-    if isinstance(bulk.columns, pd.MultiIndex):
-        close_df = bulk.xs("Close", level=1, axis=1)
-        div_df   = bulk.xs("Dividends", level=1, axis=1) \
-                   if "Dividends" in bulk.columns.get_level_values(1) else pd.DataFrame()
-    else:  # nur 1 Ticker
-        close_df = bulk[["Close"]].rename(columns={"Close": tick[0]})
-        div_df   = bulk[["Dividends"]] if "Dividends" in bulk else pd.DataFrame()
-
-    # Hilfs-Suche nach Serie (Ticker in Spalten könnte ohne Suffix stehen)
-    def find_close(df: pd.DataFrame, tkr: str) -> pd.Series:
-        if tkr in df:
-            return df[tkr].dropna()
-        uc = {c.upper(): c for c in df.columns}
-        real = uc.get(tkr.upper())
-        return df[real].dropna() if real else pd.Series()
-
-    rows = []
-    for t in tick:
-        ts   = datetime.datetime.now().strftime("%H:%M:%S")
-        info = safe_info(yf.Ticker(t))
-
-        # Name / Kurs / Währung
-        if info:
-            name  = info.get("longName") or info.get("shortName") or t
-            price = info.get("regularMarketPrice") or info.get("currentPrice")
-            cur   = info.get("currency", "USD")
-        else:
-            name  = t
-            price = find_close(close_df, t).iloc[-1] if not find_close(close_df, t).empty else None
-            cur   = "EUR"
-
-        if t.endswith(".L") and cur == "GBp" and price:
-            price /= 100; cur = "GBP"
-        price_eur = round(price * fx(cur), 2) if price else None
-
-        # Dividende
-        div = st.session_state.ovr.get(t)
-        if div is None:
-            div = info.get("trailingAnnualDividendRate") if info else 0
-            if not div:
-                dy = info.get("dividendYield") if info else 0
-                if dy and price:
-                    div = price * (dy / 100 if dy > 1 else dy)
-            if not div and (not div_df.empty and t in div_df):
-                div = div_df[t].tail(252).sum()
-        div_eur = round(div * fx(cur), 2) if div else None
-
-        # Veränderungen
-        series     = find_close(close_df, t)
-        change_str = "/".join(pct_from_series(series))
-
-        rows.append({
-            "Unternehmen":            name,
-            "Ticker":                 t,
-            "Kurs (€)":               f"€ {price_eur:,.2f}" if price_eur else "N/A",
-            "Jahresdividende (€)":    f"€ {div_eur:,.2f}"   if div_eur else "N/A",
-            "Dividendenrendite (%)":  f"{div_eur/price_eur*100:.2f}"
-                                       if div_eur and price_eur else "N/A",
-            "Veränderung T/W/M/J":    change_str,
-            "Stand":                  ts,
-        })
-
-    df = pd.DataFrame(rows)
-    df["__sort"] = df["Veränderung T/W/M/J"].apply(day_change)
-    df.sort_values("__sort", ascending=False, inplace=True)
-    df.drop(columns="__sort", inplace=True)
+    # Historie → Rohdaten → Renditen → Veränderungen über die Engine
+    stats = RunStats("streamlit")
+    df, raws = analyze_portfolio(tick, OVERRIDES.values(), stats=stats)
+    st.session_state.raws = {r["ticker"]: r for r in raws}
     st.session_state.res = df
+    st.session_state.perf = stats
+    st.session_state.yhist = None
+    st.session_state.export = None
+    if record:
+        try:
+            append_snapshot(current_rows())
+        except (ExportError, OSError) as e:
+            st.warning(f"Renditeverlauf nicht gespeichert: {e}")
 
 # ───────── Tabelle ────────────────────────────────────────────
 if st.session_state.res is not None:
-    st.dataframe(st.session_state.res, use_container_width=True)
+    stats = st.session_state.perf
+    with stats.stage("render") if do_run and stats else nullcontext():
+        st.dataframe(render_table(st.session_state.res), column_config=COLUMN_CONFIG,
+                     use_container_width=True)
+    if do_run and stats:
+        stats.finish().write_log()
+    if stats:
+        show_perf(stats)
+    show_export()
+    if st.toggle("Renditeverlauf (12 Monate rollierend)"):
+        show_yield_history()
 
 # ───────── Override-Dialog ────────────────────────────────────
-if do_edit and st.session_state.res is not None:
+# Bearbeitungsmodus in der Sitzung halten, sonst fehlt das Formular beim Absenden
+if do_edit:
+    st.session_state.edit = True
+if st.session_state.edit and st.session_state.res is not None:
     cmap = {r["Unternehmen"]: r["Ticker"] for _, r in st.session_state.res.iterrows()}
+    st.subheader("Dividende manuell erfassen")
+    comp = st.selectbox("Unternehmen", list(cmap.keys()))
+    tkr  = cmap[comp]
+    hist = OVERRIDES.history(tkr)[-3:]
+    if hist:
+        st.caption("Zuletzt: " + ", ".join(
+            f"{stamp[:10]} {'gelöscht' if v is None else fmt_eur(v)}" for stamp, v in reversed(hist)))
     with st.form("ovr", clear_on_submit=True):
-        st.subheader("Dividende manuell erfassen")
-        comp = st.selectbox("Unternehmen", list(cmap.keys()))
-        tkr  = cmap[comp]
-        cur  = st.session_state.ovr.get(tkr, "")
+        cur  = OVERRIDES.get(tkr, "")
         val  = st.text_input("Dividende in € (leer = löschen)", value=str(cur))
         a, b = st.columns(2)
         if a.form_submit_button("Speichern"):
             v = val.replace(",", ".").strip()
-            if v == "":
-                st.session_state.ovr.pop(tkr, None)
-            else:
-                try:
-                    st.session_state.ovr[tkr] = float(v)
-                except ValueError:
-                    st.error("Ungültige Zahl"); st.stop()
-            save_overrides(st.session_state.ovr)
-            st.session_state.res = None
-            st.experimental_rerun()
+            try:
+                OVERRIDES.set(tkr, float(v) if v else None)
+            except ValueError:
+                st.error("Ungültige Zahl"); st.stop()
+            st.session_state.edit = False
+            rederive([tkr])
+            st.rerun()
         if b.form_submit_button("Abbrechen"):
-            st.experimental_rerun()
+            st.session_state.edit = False
+            st.rerun()
+
+# ───────── Screener ───────────────────────────────────────────
+with st.expander("Screener: ganzes Universum aus einer Symboldatei"):
+    up = st.file_uploader("Symboldatei (Ticker durch Komma, Leerzeichen oder Zeilen getrennt)",
+                          type=["txt", "csv"])
+    s1, s2 = st.columns(2)
+    k_top     = s1.number_input("Top K", min_value=1, max_value=1000, value=TOP_K)
+    min_yield = s2.number_input("Mindestrendite (%)", min_value=0.0, value=0.0, step=0.5)
+    s3, s4 = st.columns(2)
+    curs = s3.multiselect("Währungen", ["EUR", "USD", "GBP", "CHF", "SEK", "NOK", "DKK", "CAD"])
+    sufs = s4.text_input("Börsensuffixe (z.B. .DE .AS US)", "")
+    if st.button("Screening starten", disabled=up is None):
+        status, board = st.empty(), st.empty()
+        lines = io.TextIOWrapper(up, encoding="utf-8")
+        for p in screen(iter_tickers(lines), int(k_top), min_yield or None, curs or None,
+                        sufs.replace(",", " ").split() or None, OVERRIDES.values()):
+            state = "fertig" if p.done else "läuft"
+            status.caption(f"Screening {state}: {p.scanned} gescannt, {p.matched} Treffer, {p.errors} Fehler")
+            board.dataframe(results_frame(p.leaders).drop(columns=["Override", "Fehler"]),
+                            column_config=COLUMN_CONFIG, use_container_width=True)
@@ -0,0 +1,229 @@
+# ───────────────────────────────────────────────────────────────
+# Offline-Ersatz für yfinance (nur für Benchmarks und Lasttests)
+# Liefert aufgezeichnete info-/Kurs-Fixtures mit einstellbarer Latenz
+# und Fehlerquote und zählt jeden Upstream-Aufruf.
+#
+#   import fake_yfinance
+#   fake_yfinance.install()          # ersetzt sys.modules["yfinance"]
+#   fake_yfinance.configure(latency=0.05, error_rate=0.02)
+# ───────────────────────────────────────────────────────────────
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import types
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+FIXTURE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "yahoo_snapshot.json")
+HISTORY_DAYS = 4 * 365 + 30   # reicht für den Renditeverlauf (3 Jahre + 12 Monate Vorlauf)
+# Synthetische Ticker für große Portfolios: BM00042.L usw.
+SYNTHETIC = re.compile(r"^BM(\d+)")
+
+__version__ = "fake"
+
+_lock = threading.Lock()
+_config = {"latency": 0.0, "per_symbol_latency": 0.0, "error_rate": 0.0}
+_counters = Counter()
+_rng = random.Random(0)
+_fixture = None
+
+
+class YFRateLimitError(Exception):
+    """Simulierter Yahoo-Fehler (Drosselung/Netz)."""
+
+
+# ───────── Konfiguration ──────────────────────────────────────
+def configure(latency=0.0, error_rate=0.0, seed=0, per_symbol_latency=0.0, fixture=FIXTURE_FILE):
+    global _fixture
+    with _lock:
+        _config.update(latency=latency, error_rate=error_rate, per_symbol_latency=per_symbol_latency)
+        _rng.seed(seed)
+        with open(fixture, "r", encoding="utf-8") as f:
+            _fixture = json.load(f)
+        _history.cache_clear()
+
+def install():
+    """Dieses Modul als `yfinance` registrieren (vor dem Import der App-Module)."""
+    if _fixture is None:
+        configure()
+    sys.modules["yfinance"] = sys.modules[__name__]
+
+def reset_counters():
+    with _lock:
+        _counters.clear()
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+def portfolio(size):
+    """Fixture-Ticker plus synthetische Ticker (mit passenden Börsensuffixen) bis `size`."""
+    if _fixture is None:
+        configure()
+    base = list(_fixture["info"])
+    out = base[:size]
+    for i in range(len(out), size):
+        template = base[i % len(base)]
+        suffix = template[template.index("."):] if "." in template else ""
+        out.append(f"BM{i:05d}{suffix}")
+    return out
+
+
+# ───────── Upstream-Simulation ────────────────────────────────
+def _call(kind, symbols=1):
+    with _lock:
+        _counters[kind] += 1
+        _counters["symbols"] += symbols
+        fail = _rng.random() < _config["error_rate"]
+        delay = _config["latency"] + _config["per_symbol_latency"] * symbols
+    if delay:
+        time.sleep(delay)
+    if fail:
+        raise YFRateLimitError("Too Many Requests (simuliert)")
+
+def _template(symbol):
+    if symbol in _fixture["info"] or symbol in _fixture["fx"]:
+        return symbol
+    m = SYNTHETIC.match(symbol)
+    if m:
+        base = list(_fixture["info"])
+        return base[int(m.group(1)) % len(base)]
+    raise KeyError(symbol)
+
+def _info(symbol):
+    info = dict(_fixture["info"][_template(symbol)])
+    info["symbol"] = symbol
+    return info
+
+@lru_cache(maxsize=None)
+def _days():
+    return pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=HISTORY_DAYS)
+
+@lru_cache(maxsize=None)
+def _history(symbol):
+    """Tagesreihe (Close, Dividends) – aufgezeichnet oder deterministisch erzeugt.
+
+    Zwischengespeichert, damit der Ersatz selbst die Messung nicht dominiert.
+    """
+    recorded = _fixture.get("history", {}).get(symbol)
+    if recorded:
+        idx = pd.DatetimeIndex(recorded["dates"])
+        return pd.DataFrame({"Close": recorded["close"], "Dividends": recorded["dividends"]}, index=idx)
+
+    template = _template(symbol)
+    idx = _days()
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    if template in _fixture["fx"]:
+        start, vol = _fixture["fx"][template], 0.003
+    else:
+        start, vol = _fixture["info"][template].get("regularMarketPrice") or 50.0, 0.012
+    close = start * np.exp(np.cumsum(rng.normal(0, vol, len(idx))))
+    close *= start / close[-1]   # letzter Kurs = Fixture-Kurs
+    dividends = np.zeros(len(idx))
+    rate = _fixture["info"].get(template, {}).get("trailingAnnualDividendRate") or 0
+    if rate:
+        dividends[len(idx) - 1 - np.arange(10, len(idx), 63)] = rate / 4
+    return pd.DataFrame({"Close": close, "Dividends": dividends}, index=idx)
+
+def _window(df, period=None, start=None):
+    if start is not None:
+        return df[df.index >= pd.Timestamp(start)]
+    if period in (None, "max"):
+        return df
+    days = {"1d": 1, "5d": 5, "1mo": 30, "3mo": 90, "6mo": 180, "1y": 365, "2y": 730}.get(period)
+    if days is None:
+        days = int(period.rstrip("d"))
+    return df[df.index > df.index[-1] - pd.Timedelta(days=days)]
+
+
+# ───────── yfinance-API (Ausschnitt) ──────────────────────────
+class _FastInfo:
+    def __init__(self, symbol):
+        self._symbol = symbol
+
+    def __getitem__(self, key):
+        if key not in ("last_price", "lastPrice"):
+            raise KeyError(key)
+        _call("fast_info")
+        return float(_history(self._symbol)["Close"].iloc[-1])
+
+
+class Ticker:
+    def __init__(self, ticker, session=None):
+        self.ticker = ticker.upper()
+
+    def get_info(self):
+        _call("info")
+        return _info(self.ticker)
+
+    @property
+    def info(self):
+        return self.get_info()
+
+    @property
+    def fast_info(self):
+        return _FastInfo(self.ticker)
+
+    def history(self, period="1mo", interval="1d", start=None, end=None,
+                actions=True, auto_adjust=True, **kwargs):
+        _call("history")
+        df = _window(_history(self.ticker), period, start)
+        return df if actions else df[["Close"]]
+
+
+class Tickers:
+    def __init__(self, tickers, session=None):
+        symbols = tickers.replace(",", " ").split() if isinstance(tickers, str) else list(tickers)
+        self.symbols = [s.upper() for s in symbols]
+        self.tickers = {s: Ticker(s) for s in self.symbols}
+
+
+class YfData:
+    """Sitzung für direkte Endpunkte; nur der Quote-Sammelabruf (v7/finance/quote)."""
+
+    def __init__(self, session=None):
+        pass
+
+    def get_raw_json(self, url, params=None, timeout=30):
+        if not url.rstrip("?").endswith("/v7/finance/quote"):
+            raise NotImplementedError(url)
+        symbols = [s.upper() for s in params["symbols"].split(",") if s]
+        _call("quote", len(symbols))
+        result = []
+        for symbol in symbols:
+            try:
+                result.append(_info(symbol))
+            except KeyError:
+                continue   # wie Yahoo: unbekannte Symbole fehlen in der Antwort
+        return {"quoteResponse": {"result": result, "error": None}}
+
+
+data = types.SimpleNamespace(YfData=YfData)
+
+
+def download(tickers, start=None, end=None, period=None, interval="1d",
+             group_by="column", auto_adjust=False, actions=False,
+             threads=True, progress=True, **kwargs):
+    symbols = tickers.replace(",", " ").split() if isinstance(tickers, str) else list(tickers)
+    _call("download", len(symbols))
+    frames = {}
+    for symbol in symbols:
+        try:
+            df = _window(_history(symbol), period or ("1mo" if start is None else None), start)
+        except KeyError:
+            continue   # wie yfinance: unbekannte Symbole fehlen einfach
+        frames[symbol] = df if actions else df.drop(columns="Dividends")
+    if not frames:
+        return pd.DataFrame()
+    bulk = pd.concat(frames, axis=1)
+    if group_by != "ticker":
+        bulk = bulk.swaplevel(0, 1, axis=1).sort_index(axis=1)
+    return bulk
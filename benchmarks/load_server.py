@@ -0,0 +1,70 @@
+# ───────────────────────────────────────────────────────────────
+# Streamlit-Server für den Lasttest: `streamlit run Streamlit-App.py`
+# in diesem Prozess, mit fake_yfinance statt yfinance. Die Zähler des
+# Ersatzes werden laufend als JSON-Datei abgelegt, damit load_test.py sie
+# von außen lesen kann.
+#
+#   python benchmarks/load_server.py --port 8599 --latency 0.05 --counters counters.json
+# ───────────────────────────────────────────────────────────────
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+APP = os.path.join(ROOT, "Streamlit-App.py")
+
+DUMP_SECONDS = 0.1
+
+
+def _dump_counters(fake, path):
+    """Zähler des Ersatzes regelmäßig (atomar) in `path` schreiben."""
+    last = None
+    while True:
+        counters = fake.counters()
+        if counters != last:
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(counters, f)
+            os.replace(tmp, path)
+            last = counters
+        time.sleep(DUMP_SECONDS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streamlit-App mit fake_yfinance als Server starten.")
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--per-symbol-latency", type=float, default=0.0005)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rate", type=float, help="Token-Bucket-Rate (0 = unbegrenzt; ohne Angabe wie in der App)")
+    parser.add_argument("--counters", default="counters.json", help="Datei für die Upstream-Zähler")
+    args = parser.parse_args(argv)
+
+    sys.path[:0] = [HERE, ROOT]
+    import fake_yfinance
+    fake_yfinance.configure(latency=args.latency, error_rate=args.error_rate,
+                            seed=args.seed, per_symbol_latency=args.per_symbol_latency)
+    fake_yfinance.install()   # vor dem ersten Skriptlauf: die App importiert dann den Ersatz
+    if args.rate is not None:
+        import rate_limiter
+        rate = float(args.rate) if args.rate > 0 else 1e9
+        rate_limiter.YAHOO_LIMITER.rate = rate_limiter.YAHOO_LIMITER.capacity = rate
+    threading.Thread(target=_dump_counters, args=(fake_yfinance, args.counters),
+                     name="counters", daemon=True).start()
+
+    from streamlit.web import cli
+    sys.argv = ["streamlit", "run", APP,
+                "--server.headless=true", f"--server.port={args.port}", "--server.address=127.0.0.1",
+                "--server.fileWatcherType=none", "--browser.gatherUsageStats=false",
+                # session_state in /_stcore/metrics tief vermessen statt nur Einträge zählen
+                "--server.enableExpensiveMemoryStats=true"]
+    return cli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
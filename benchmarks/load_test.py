@@ -0,0 +1,335 @@
+# ───────────────────────────────────────────────────────────────
+# Lasttest der Streamlit-App: viele gleichzeitige Sitzungen
+# Startet Streamlit-App.py als echten Server (load_server.py, mit
+# fake_yfinance und einstellbarer Latenz) und verbindet N Sitzungen über
+# dessen Websocket (/_stcore/stream) – wie N Browser-Tabs. Info-Cache,
+# Historie, Single-Flight und Limiter teilen sich die Sitzungen also genau
+# wie im Betrieb.
+#
+# Gemessen: Laufzeit je Analyse (p50/p95/max), Upstream-Aufrufe im
+# Verhältnis zu den eindeutigen Tickern (Verstärkung), Größe von
+# st.session_state (laut /_stcore/metrics des Servers) und Wachstum des
+# Server-Speichers.
+#
+#   python benchmarks/load_test.py                      # 20 Sitzungen × 100 Ticker
+#   python benchmarks/load_test.py --sessions 50 --latency 0.1 --universe 1000
+#   python benchmarks/load_test.py --rate 0 --save last.json --compare base.json
+# ───────────────────────────────────────────────────────────────
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+SERVER = os.path.join(HERE, "load_server.py")
+
+TICKER_LABEL = "Ticker, WKN oder ISIN (Komma getrennt)"
+RUN_LABEL = "Analyse starten"
+STATE_METRIC = 'cache_memory_bytes{cache_type="st_session_state"'
+
+
+# ───────── Messhilfen ─────────────────────────────────────────
+def _rss_mb(pid):
+    """Aktueller Speicher eines Prozesses (nur Linux, sonst None)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return None
+    pos = (len(values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _get(url, timeout=10):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read().decode("utf-8")
+
+def _wait_healthy(base, server, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server beendet (Code {server.returncode})")
+        try:
+            if _get(f"{base}/_stcore/health", timeout=2).strip() == "ok":
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server nach {timeout} s nicht erreichbar")
+
+def _session_state_bytes(base):
+    """st.session_state aller offenen Sitzungen in Bytes (Metrik des Servers)."""
+    text = _get(f"{base}/_stcore/metrics?families=cache_memory_bytes")
+    return sum(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(STATE_METRIC))
+
+def _read_counters(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# ───────── Sitzungen ──────────────────────────────────────────
+class Session:
+    """Ein Browser-Tab: Seite laden, dann `runs` Analysen mit eigener Tickerliste.
+
+    Spricht das Websocket-Protokoll des Frontends: BackMsg.rerun_script mit
+    Widget-Zuständen hinaus, ForwardMsg bis script_finished herein.
+    """
+
+    def __init__(self, no, tickers, runs, delay, timeout):
+        self.name = f"session-{no}"
+        self.tickers = tickers
+        self.runs = runs
+        self.delay = delay
+        self.timeout = timeout
+        self.latencies = []
+        self.errors = []
+        self.widgets = {}        # Beschriftung → Widget-ID (aus den gerenderten Elementen)
+        self.ready = asyncio.Event()
+
+    def _widget(self, label):
+        try:
+            return self.widgets[label]
+        except KeyError:
+            raise LookupError(f"Widget „{label}“ nicht gerendert") from None
+
+    async def _script_run(self, ws, states=()):
+        """Skriptlauf anstoßen und bis script_finished lesen; liefert die Laufzeit."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        for widget_id, field, value in states:
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            setattr(state, field, value)
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        await ws.send(msg.SerializeToString())
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await asyncio.wait_for(ws.recv(), deadline - time.monotonic()))
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                etype = element.WhichOneof("type")
+                if etype in ("text_input", "button"):
+                    widget = getattr(element, etype)
+                    self.widgets[widget.label] = widget.id
+                elif etype == "exception":
+                    self.errors.append(element.exception.message)
+            elif kind == "script_finished":
+                if fwd.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+                    self.errors.append(f"Skriptlauf: {ForwardMsg.ScriptFinishedStatus.Name(fwd.script_finished)}")
+                return time.perf_counter() - start
+
+    async def run(self, url, measured):
+        import websockets
+        await asyncio.sleep(self.delay)
+        try:
+            async with websockets.connect(url, subprotocols=["streamlit"], max_size=None,
+                                          open_timeout=self.timeout) as ws:
+                await self._script_run(ws)   # Seite laden
+                states = [(self._widget(TICKER_LABEL), "string_value", ", ".join(self.tickers)),
+                          (self._widget(RUN_LABEL), "trigger_value", True)]
+                for _ in range(self.runs):
+                    self.latencies.append(await self._script_run(ws, states))
+                self.ready.set()
+                await measured.wait()   # offen bleiben, bis session_state gemessen ist
+        except Exception as e:   # Sitzung zählt als fehlgeschlagen, der Test läuft weiter
+            self.errors.append(f"{type(e).__name__}: {e}")
+        finally:
+            self.ready.set()
+
+
+async def _drive(args, base, server, counters_file):
+    import fake_yfinance   # nur für portfolio(); der Server hat seinen eigenen Ersatz
+    from load_server import DUMP_SECONDS
+    url = base.replace("http", "ws", 1) + "/_stcore/stream"
+
+    # Seite einmal laden: Importe und Skript-Kompilat liegen danach im Server
+    warmup = Session("warmup", [], 0, 0, args.timeout)
+    measured = asyncio.Event()
+    measured.set()
+    await warmup.run(url, measured)
+    if warmup.errors:
+        raise RuntimeError(f"Seite lädt nicht: {warmup.errors[0]}")
+
+    universe = fake_yfinance.portfolio(args.universe)
+    rng = random.Random(args.seed)
+    sessions = [Session(i, rng.sample(universe, min(args.tickers, len(universe))), args.runs,
+                        args.ramp * i / max(args.sessions - 1, 1), args.timeout)
+                for i in range(args.sessions)]
+    unique = len({t for s in sessions for t in s.tickers})
+
+    await asyncio.sleep(3 * DUMP_SECONDS)
+    calls_before = _read_counters(counters_file)
+    rss_before = _rss_mb(server.pid)
+    measured = asyncio.Event()
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(s.run(url, measured)) for s in sessions]
+    for s in sessions:
+        await s.ready.wait()
+    wall = time.perf_counter() - start
+    try:
+        state_bytes = await asyncio.to_thread(_session_state_bytes, base)
+    except (OSError, ValueError):
+        state_bytes = None
+    rss_after = _rss_mb(server.pid)
+    measured.set()
+    await asyncio.gather(*tasks)
+    await asyncio.sleep(3 * DUMP_SECONDS)
+    after = _read_counters(counters_file)
+    calls = {k: v - calls_before.get(k, 0) for k, v in after.items() if v - calls_before.get(k, 0)}
+    return sessions, unique, wall, calls, state_bytes, rss_before, rss_after
+
+
+def run_load(args):
+    sys.path[:0] = [HERE, ROOT]
+    workdir = tempfile.mkdtemp(prefix="load-")   # frische Caches, keine fremden Overrides
+    port = args.port or _free_port()
+    base = f"http://127.0.0.1:{port}"
+    counters_file = os.path.join(workdir, "counters.json")
+    cmd = [sys.executable, SERVER, "--port", str(port), "--counters", counters_file,
+           "--latency", str(args.latency), "--per-symbol-latency", str(args.per_symbol_latency),
+           "--error-rate", str(args.error_rate), "--seed", str(args.seed)]
+    if args.rate is not None:
+        cmd += ["--rate", str(args.rate)]
+    # Hintergrund-Aktualisierung nur auf Wunsch – sie verfälscht die Upstream-Zählung
+    env = dict(os.environ, DIVIDENDEN_PREFETCH="1" if args.prefetch else "0")
+    log_path = os.path.join(workdir, "server.log")
+    with open(log_path, "w", encoding="utf-8") as log:
+        server = subprocess.Popen(cmd, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        try:
+            _wait_healthy(base, server, args.timeout)
+            sessions, unique, wall, calls, state_bytes, rss_before, rss_after = asyncio.run(
+                _drive(args, base, server, counters_file))
+        except Exception:
+            print(f"Server-Log: {log_path}")
+            raise
+    finally:
+        server.terminate()
+        try:
+            server.wait(30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    runs = []
+    for k in range(args.runs):
+        lat = [s.latencies[k] for s in sessions if len(s.latencies) > k]
+        runs.append({"run": k + 1, "n": len(lat),
+                     "p50_s": round(percentile(lat, 0.5) or 0, 3),
+                     "p95_s": round(percentile(lat, 0.95) or 0, 3),
+                     "max_s": round(max(lat, default=0), 3)})
+    requested = sum(len(s.tickers) for s in sessions) * args.runs
+    upstream = sum(v for k, v in calls.items() if k != "symbols")
+    grown = rss_after - rss_before if rss_before and rss_after else None
+    return {
+        "sessions": args.sessions, "tickers": args.tickers, "runs_per_session": args.runs,
+        "universe": args.universe, "unique_tickers": unique, "latency": args.latency,
+        "wall_s": round(wall, 2),
+        "runs": runs,
+        "calls": upstream, "calls_by_kind": calls,
+        # Aufrufe bzw. abgefragte Symbole je eindeutigem Ticker (1.0 = jeder Ticker genau einmal)
+        "amplification": round(upstream / unique, 3) if unique else None,
+        "symbol_amplification": round(calls.get("symbols", 0) / unique, 3) if unique else None,
+        "requested_tickers": requested,
+        "session_state_mb_mean": round(state_bytes / args.sessions / 2**20, 3) if state_bytes else None,
+        "session_state_mb_total": round(state_bytes / 2**20, 2) if state_bytes else None,
+        "rss_growth_mb": round(grown, 1) if grown is not None else None,
+        "rss_per_session_mb": round(grown / args.sessions, 2) if grown is not None else None,
+        "errors": [f"{s.name}: {e}" for s in sessions for e in s.errors][:20],
+        "failed_sessions": sum(1 for s in sessions if s.errors),
+    }
+
+
+# ───────── Ausgabe und Vergleich ──────────────────────────────
+def _print_report(r):
+    print(f"{r['sessions']} Sitzungen × {r['tickers']} Ticker × {r['runs_per_session']} Läufe "
+          f"({r['unique_tickers']} eindeutige Ticker, Latenz {r['latency']} s) – gesamt {r['wall_s']} s")
+    head = f"{'Lauf':<6}{'n':>4}{'p50 [s]':>10}{'p95 [s]':>10}{'max [s]':>10}"
+    print(head)
+    print("─" * len(head))
+    for run in r["runs"]:
+        print(f"{run['run']:<6}{run['n']:>4}{run['p50_s']:>10.2f}{run['p95_s']:>10.2f}{run['max_s']:>10.2f}")
+    kinds = ", ".join(f"{k}={v}" for k, v in sorted(r["calls_by_kind"].items()))
+    print(f"Upstream-Aufrufe: {r['calls']} ({kinds})")
+    print(f"Verstärkung: {r['amplification']} Aufrufe bzw. {r['symbol_amplification']} Symbole je eindeutigem "
+          f"Ticker (angefragt: {r['requested_tickers']} Ticker)")
+    print(f"session_state: Ø {r['session_state_mb_mean']} MB, Summe {r['session_state_mb_total']} MB")
+    print(f"Server-Speicher: +{r['rss_growth_mb']} MB ({r['rss_per_session_mb']} MB je Sitzung)")
+    if r["failed_sessions"]:
+        print(f"FEHLER in {r['failed_sessions']} Sitzungen:")
+        for line in r["errors"]:
+            print(f"  {line}")
+
+def _compare(r, path, tolerance):
+    with open(path, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    regressions = []
+    for key in ("calls", "session_state_mb_mean", "rss_growth_mb"):
+        if base.get(key) and r.get(key) and r[key] > base[key] * (1 + tolerance):
+            regressions.append(f"{key} {base[key]} → {r[key]}")
+    for old, new in zip(base.get("runs", []), r["runs"]):
+        for key in ("p50_s", "p95_s"):
+            if old.get(key) and new[key] > old[key] * (1 + tolerance):
+                regressions.append(f"Lauf {new['run']} {key} {old[key]} → {new[key]}")
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return not regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lasttest: viele Streamlit-Sitzungen gegen einen Offline-Yahoo-Ersatz.")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--tickers", type=int, default=100, help="Ticker je Sitzung")
+    parser.add_argument("--universe", type=int, default=300, help="Ticker-Pool, aus dem die Sitzungen ziehen")
+    parser.add_argument("--runs", type=int, default=2, help="Analysen je Sitzung (1. kalt, danach warm)")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Sitzungsstarts über so viele Sekunden verteilen")
+    parser.add_argument("--latency", type=float, default=0.05, help="Sekunden je Upstream-Aufruf")
+    parser.add_argument("--per-symbol-latency", type=float, default=0.0005,
+                        help="zusätzliche Sekunden je Symbol eines Bulk-Aufrufs")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rate", type=float, help="Token-Bucket-Rate (0 = unbegrenzt; ohne Angabe wie in der App)")
+    parser.add_argument("--prefetch", action="store_true", help="Hintergrund-Aktualisierung der App zulassen")
+    parser.add_argument("--timeout", type=float, default=900, help="Sekunden je Skriptlauf")
+    parser.add_argument("--port", type=int, help="Port des Test-Servers (ohne Angabe: freier Port)")
+    parser.add_argument("--save", help="Ergebnis als JSON speichern")
+    parser.add_argument("--compare", help="mit gespeichertem Ergebnis vergleichen")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    result = run_load(args)
+    _print_report(result)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=1)
+    if args.compare and not _compare(result, args.compare, args.tolerance):
+        return 1
+    return 1 if result["failed_sessions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# ───────────────────────────────────────────────────────────────
+# Nimmt echte Yahoo-Antworten als Benchmark-Fixture auf
+#
+#   python benchmarks/record_fixtures.py                 # Ticker aus config.txt
+#   python benchmarks/record_fixtures.py SAP.DE O IMB.L
+# ───────────────────────────────────────────────────────────────
+import argparse
+import json
+import os
+import sys
+
+import yfinance as yf
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dividend_engine import CONFIG_FILE, iter_tickers  # noqa: E402
+from fake_yfinance import FIXTURE_FILE, HISTORY_DAYS  # noqa: E402
+from fx_rates import FX_PIVOT, major_currency  # noqa: E402
+from yahoo_cache import FIELD_GROUPS  # noqa: E402
+
+INFO_FIELDS = [field for fields in FIELD_GROUPS.values() for field in fields]
+
+
+def record(tickers, path=FIXTURE_FILE):
+    fixture = {"info": {}, "fx": {}, "history": {}}
+    for t in tickers:
+        stock = yf.Ticker(t)
+        info = stock.get_info() or {}
+        fixture["info"][t] = {k: info[k] for k in INFO_FIELDS if info.get(k) is not None}
+        hist = stock.history(period=f"{HISTORY_DAYS}d", actions=True, auto_adjust=False)
+        if not hist.empty:
+            fixture["history"][t] = {
+                "dates": [d.strftime("%Y-%m-%d") for d in hist.index],
+                "close": [round(float(v), 6) for v in hist["Close"]],
+                "dividends": [round(float(v), 6) for v in hist.get("Dividends", 0 * hist["Close"])],
+            }
+        print(f"{t}: {len(hist)} Tage")
+
+    currencies = {major_currency(i.get("currency"))[0] for i in fixture["info"].values() if i.get("currency")}
+    pairs = {f"{c}EUR=X" for c in currencies if c != "EUR"}
+    pairs |= {f"{c}{FX_PIVOT}=X" for c in currencies if c != FX_PIVOT}
+    for pair in sorted(pairs):
+        hist = yf.Ticker(pair).history(period="5d")
+        if not hist.empty:
+            fixture["fx"][pair] = round(float(hist["Close"].iloc[-1]), 6)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(fixture, f, ensure_ascii=False, indent=1)
+    print(f"Fixture gespeichert: {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Yahoo-Antworten als Benchmark-Fixture aufzeichnen.")
+    parser.add_argument("tickers", nargs="*")
+    parser.add_argument("-o", "--output", default=FIXTURE_FILE)
+    args = parser.parse_args(argv)
+    if args.tickers:
+        tickers = list(iter_tickers(args.tickers))
+    else:
+        with open(os.path.join(ROOT, CONFIG_FILE), "r", encoding="utf-8") as f:
+            tickers = list(iter_tickers(f))
+    record(tickers, args.output)
+
+
+if __name__ == "__main__":
+    main()
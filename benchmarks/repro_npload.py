@@ -0,0 +1,66 @@
+# ───────────────────────────────────────────────────────────────
+# Nachstellung des np.load-Fehlers, gegen den history_store._NPY_OPEN
+# schützt: mehrere Threads auf verschiedener Stacktiefe öffnen dieselbe
+# .npy-Datei, ein GC-Callback erzwingt Threadwechsel mitten in
+# ast.literal_eval. Unter CPython < 3.13 ohne Lock → SystemError.
+#
+#   python benchmarks/repro_npload.py           # ohne Lock
+#   python benchmarks/repro_npload.py --lock    # wie history_store
+# ───────────────────────────────────────────────────────────────
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+ROW = np.dtype([("day", "<i4"), ("close", "<f4"), ("div", "<f4")])
+THREADS = 6
+LOADS = 500
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallele np.load-Aufrufe auf SystemError prüfen.")
+    parser.add_argument("--lock", action="store_true", help="Aufrufe wie history_store serialisieren")
+    args = parser.parse_args(argv)
+
+    lock = threading.Lock() if args.lock else None
+    errors = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "t.npy")
+        np.save(path, np.zeros(10, ROW))
+
+        def load():
+            try:
+                if lock:
+                    with lock:
+                        np.load(path, mmap_mode="r")
+                else:
+                    np.load(path, mmap_mode="r")
+            except SystemError as e:
+                errors.append(e)
+
+        def at_depth(depth):
+            if depth:
+                return at_depth(depth - 1)
+            for _ in range(LOADS):
+                load()
+
+        gc.callbacks.append(lambda phase, info: time.sleep(0))   # Threadwechsel im GC
+        gc.set_threshold(10)
+        threads = [threading.Thread(target=at_depth, args=(3 * i,)) for i in range(THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    print(f"Python {sys.version.split()[0]} {'mit' if lock else 'ohne'} Lock: "
+          f"{len(errors)} SystemError", *errors[:1])
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
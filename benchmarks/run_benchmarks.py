@@ -0,0 +1,217 @@
+# ───────────────────────────────────────────────────────────────
+# Replay-Benchmarks ohne Netz
+# Streamlit-Ablauf (analyze_portfolio) und Tk-fetch_data (headless) über
+# Portfolios von 20/500/5000 Tickern gegen fake_yfinance.
+# Jeder Fall läuft in einem eigenen Prozess mit leerem Cache-Verzeichnis,
+# einmal kalt und einmal warm. Der Speicher wird je Phase gemessen
+# (aktueller RSS, während der Phase abgetastet).
+#
+#   python benchmarks/run_benchmarks.py
+#   python benchmarks/run_benchmarks.py --sizes 20 500 --latency 0.05 --error-rate 0.02
+#   python benchmarks/run_benchmarks.py --save baseline.json
+#   python benchmarks/run_benchmarks.py --compare baseline.json --tolerance 0.25
+# ───────────────────────────────────────────────────────────────
+import argparse
+import json
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+CASES = ("streamlit", "tk")
+SIZES = (20, 500, 5000)
+PHASES = ("cold", "warm")
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+
+RSS_SAMPLE_SECONDS = 0.01
+
+
+def _rss_mb():
+    """Aktueller Speicher dieses Prozesses (nur Linux, sonst None)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class PhaseMemory:
+    """Höchster und zusätzlicher RSS während einer Phase.
+
+    ru_maxrss kennt nur das Maximum seit Prozessstart – die warme Phase
+    würde damit den Spitzenwert der kalten wiederholen. Daher wird der
+    aktuelle RSS in einem Hilfsthread abgetastet.
+    """
+
+    def __init__(self, first=False):
+        self.first = first    # erste Phase im Prozess: ru_maxrss taugt als Ersatz
+        self.before = self.after = self.peak = None
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        self.before = self.peak = _rss_mb()
+        if self.before is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(RSS_SAMPLE_SECONDS):
+            self.peak = max(self.peak, _rss_mb() or 0)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self.before is None:
+            # ohne /proc: nur die erste Phase hat einen aussagekräftigen Spitzenwert
+            if resource is not None and self.first:
+                self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            return False
+        self._thread.join()
+        self.after = _rss_mb()
+        self.peak = max(self.peak, self.after)
+        return False
+
+    def report(self):
+        rnd = lambda v: round(v, 1) if v is not None else None
+        grown = self.after - self.before if self.after is not None else None
+        return {"peak_rss_mb": rnd(self.peak), "rss_growth_mb": rnd(grown)}
+
+
+
+# ───────── Einzelfall (Kindprozess) ───────────────────────────
+def _run_streamlit(tickers, workers):
+    from dividend_engine import analyze_portfolio
+    df, _ = analyze_portfolio(tickers, {}, workers=workers)
+    return len(df)
+
+def _run_tk(tickers, workers):
+    # fetch_data braucht vom Fenster nur die Queue und die Overrides
+    from dividendenrendite_tracker import DividendTrackerApp
+    app = types.SimpleNamespace(result_queue=queue.Queue(), dividend_overrides={})
+    DividendTrackerApp.fetch_data(app, tickers, max_workers=workers)
+    rows = 0
+    while app.result_queue.get_nowait()[0] != "done":
+        rows += 1
+    return rows
+
+def run_case(case, size, args):
+    sys.path[:0] = [HERE, ROOT]
+    import fake_yfinance
+    fake_yfinance.configure(latency=args.latency, error_rate=args.error_rate,
+                            seed=args.seed, per_symbol_latency=args.per_symbol_latency)
+    fake_yfinance.install()
+
+    os.chdir(tempfile.mkdtemp(prefix="bench-"))   # frische Caches je Fall
+    import rate_limiter
+    if args.rate > 0:
+        rate_limiter.YAHOO_LIMITER.rate = rate_limiter.YAHOO_LIMITER.capacity = float(args.rate)
+    else:
+        rate_limiter.YAHOO_LIMITER.rate = rate_limiter.YAHOO_LIMITER.capacity = 1e9
+
+    runner = {"streamlit": _run_streamlit, "tk": _run_tk}[case]
+    tickers = fake_yfinance.portfolio(size)
+    results = []
+    for phase in PHASES:
+        fake_yfinance.reset_counters()
+        with PhaseMemory(first=phase == PHASES[0]) as memory:
+            start = time.perf_counter()
+            rows = runner(tickers, args.workers)
+            wall = time.perf_counter() - start
+        calls = fake_yfinance.counters()
+        results.append({
+            "case": case, "size": size, "phase": phase, "rows": rows,
+            "wall_s": round(wall, 3),
+            "calls": sum(v for k, v in calls.items() if k != "symbols"),
+            "calls_by_kind": calls,
+            **memory.report(),
+        })
+    return results
+
+
+# ───────── Steuerung ──────────────────────────────────────────
+def _child_args(args):
+    return ["--latency", str(args.latency), "--per-symbol-latency", str(args.per_symbol_latency),
+            "--error-rate", str(args.error_rate), "--seed", str(args.seed),
+            "--rate", str(args.rate), "--workers", str(args.workers)]
+
+def _print_table(results):
+    head = (f"{'Fall':<10}{'Ticker':>7}  {'Phase':<5}{'Zeilen':>7}{'Zeit [s]':>10}{'Aufrufe':>9}"
+            f"{'RSS [MB]':>10}{'+RSS':>8}  Aufrufe je Art")
+    print(head)
+    print("─" * len(head))
+    for r in results:
+        kinds = ", ".join(f"{k}={v}" for k, v in sorted(r["calls_by_kind"].items()))
+        print(f"{r['case']:<10}{r['size']:>7}  {r['phase']:<5}{r['rows']:>7}{r['wall_s']:>10.2f}"
+              f"{r['calls']:>9}{r['peak_rss_mb'] or 0:>10.1f}{r['rss_growth_mb'] or 0:>8.1f}  {kinds}")
+
+def _compare(results, path, tolerance):
+    with open(path, "r", encoding="utf-8") as f:
+        baseline = {(r["case"], r["size"], r["phase"]): r for r in json.load(f)}
+    regressions = []
+    for r in results:
+        base = baseline.get((r["case"], r["size"], r["phase"]))
+        if base is None:
+            continue
+        for key in ("wall_s", "calls", "peak_rss_mb"):
+            if base.get(key) and r.get(key) and r[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{r['case']}/{r['size']}/{r['phase']}: {key} {base[key]} → {r[key]}")
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return not regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay-Benchmarks gegen einen Offline-Yahoo-Ersatz.")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    parser.add_argument("--latency", type=float, default=0.02, help="Sekunden je Upstream-Aufruf")
+    parser.add_argument("--per-symbol-latency", type=float, default=0.0005,
+                        help="zusätzliche Sekunden je Symbol eines Bulk-Aufrufs")
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rate", type=float, default=0, help="Token-Bucket-Rate (0 = unbegrenzt)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--save", help="Ergebnisse als JSON speichern")
+    parser.add_argument("--compare", help="mit gespeicherten Ergebnissen vergleichen")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--child", nargs=2, metavar=("FALL", "GRÖSSE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_case(args.child[0], int(args.child[1]), args)))
+        return 0
+
+    results = []
+    for case in args.cases:
+        for size in args.sizes:
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", case, str(size), *_child_args(args)],
+                capture_output=True, text=True, cwd=ROOT,
+            )
+            if proc.returncode != 0:
+                print(f"{case}/{size} fehlgeschlagen:\n{proc.stderr}", file=sys.stderr)
+                return 1
+            results.extend(json.loads(proc.stdout.strip().splitlines()[-1]))
+    _print_table(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+    if args.compare and not _compare(results, args.compare, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
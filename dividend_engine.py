@@ -0,0 +1,601 @@
+# ───────────────────────────────────────────────────────────────
+# Dividenden-Engine – Abruf → Währung → Dividenden-Fallbacks → Rendite
+# Gemeinsam genutzt von Tk-App, Streamlit-App und Kommandozeile
+# (läuft ohne Tk und ohne Streamlit)
+#
+#   python dividend_engine.py                    # Ticker aus config.txt
+#   python dividend_engine.py -f liste.txt --format csv > out.csv
+#   python dividend_engine.py SAP.DE O IMB.L
+#   python dividend_engine.py -f liste.txt -o out.parquet --snapshot
+# ───────────────────────────────────────────────────────────────
+import argparse
+import contextlib
+import csv
+import datetime
+import itertools
+import json
+import sys
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from fx_rates import FX, major_currency
+from history_store import HISTORY
+from override_store import OVERRIDE_FILE, OVERRIDES, OverrideStore, OverrideValues
+from perf_stats import NO_STATS
+from rate_limiter import YAHOO_BREAKER, YAHOO_LIMITER, BreakerOpen, backoff_delay
+from result_export import SNAPSHOT_DIR, open_export, snapshot_export
+# Zeilen und Anzeigeformat liegen ohne schwere Abhängigkeiten in result_rows
+from result_rows import (COLUMN_FIELDS, DISPLAY_COLUMNS, NUMERIC_COLUMNS, ROW_FIELDS,  # noqa: F401
+                         ResultRow, fmt_eur, fmt_pct, format_row)
+from symbol_index import SYMBOLS
+from yahoo_cache import INFO_CACHE
+
+CONFIG_FILE   = "config.txt"
+# Anzahl paralleler Abrufe; das Tempo gegenüber Yahoo begrenzt YAHOO_LIMITER
+MAX_WORKERS   = 8
+# Handelstage für die Dividendensumme aus einer bereits geladenen Historie
+HISTORY_ROWS  = 252
+# Sammelabruf der info-Daten (Yahoo-Quote-Endpunkt, viele Symbole je Aufruf)
+QUOTE_URL     = "https://query1.finance.yahoo.com/v7/finance/quote"
+QUOTE_BATCH   = 100
+
+
+# ───────── Eingaben ───────────────────────────────────────────
+def iter_tickers(lines):
+    """Ticker aus Textzeilen (Komma/Leerzeichen getrennt, '#' = Kommentar)."""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        for part in line.replace(",", " ").split():
+            yield part.upper()
+
+def resolve_tickers(identifiers):
+    """WKN/ISIN/Alias über den Symbolindex in Yahoo-Ticker; Unbekanntes wird gemeldet und übersprungen."""
+    for identifier in identifiers:
+        ticker = SYMBOLS.resolve(identifier)
+        if ticker is None:
+            print(f"Nicht im Symbolindex gefunden: {identifier}", file=sys.stderr)
+        else:
+            yield ticker
+
+def load_overrides(path=OVERRIDE_FILE):
+    """Overrides (Ticker → €) über den gemeinsamen OverrideStore."""
+    store = OVERRIDES if path == OVERRIDES.path else OverrideStore(path)
+    return store.values()
+
+
+# ───────── Yahoo-Abruf ────────────────────────────────────────
+def _guarded(kind, call, stats=NO_STATS, breaker=YAHOO_BREAKER):
+    """Ein Yahoo-Aufruf hinter Breaker und Limiter; leeres Ergebnis = Fehlschlag."""
+    token = breaker.allow()
+    if token is None:
+        stats.skip(kind)
+        raise BreakerOpen(f"Yahoo-Abrufe pausiert ({kind})")
+    YAHOO_LIMITER.acquire()
+    stats.call(kind)
+    ok = False
+    try:
+        result = call()
+        ok = not (result is None or (isinstance(result, dict) and not result))
+        return result
+    finally:
+        breaker.record(ok, token)
+
+def safe_info(stock, tries=3, stats=NO_STATS, breaker=YAHOO_BREAKER):
+    """info-Dict mit Wiederholungen (Backoff mit Jitter); {} wenn Yahoo nichts liefert.
+
+    Bei offenem Breaker wird nicht gewartet, sondern sofort BreakerOpen
+    geworfen; ein Fehler des letzten Versuchs wird weitergereicht.
+    """
+    for attempt in range(tries):
+        try:
+            data = _guarded("info", stock.get_info, stats, breaker)
+        except BreakerOpen:
+            raise
+        except Exception:
+            if attempt == tries - 1:
+                raise
+            data = None
+        if data:
+            return data
+        if attempt < tries - 1:
+            delay = backoff_delay(attempt)
+            time.sleep(delay)
+            stats.retry(delay)
+    return {}
+
+def _quote_request(symbols):
+    # YfData ist die Sitzung von yfinance (Cookie/Crumb wie bei Ticker.info)
+    data = yf.data.YfData().get_raw_json(
+        QUOTE_URL, params={"symbols": ",".join(symbols), "formatted": "false"})
+    return (data.get("quoteResponse") or {}).get("result") or []
+
+def fetch_quotes(symbols, closes=None, stats=NO_STATS):
+    """Name, Währung, Kurs und Dividendenfelder vieler Symbole; ein Aufruf je QUOTE_BATCH.
+
+    Liefert {Symbol: info-Dict} mit denselben Feldnamen und Einheiten wie
+    Ticker.info (dividendYield in Prozent); fehlt der Kurs, wird der letzte
+    Schlusskurs aus `closes` (Symbol → Kurs) eingesetzt. Ein fehlgeschlagener Block wird
+    ausgelassen – dessen Symbole laden danach einzeln.
+    """
+    closes = closes or {}
+    out = {}
+    for i in range(0, len(symbols), QUOTE_BATCH):
+        batch = symbols[i:i + QUOTE_BATCH]
+        try:
+            quotes = _guarded("quote_batch", lambda: _quote_request(batch), stats)
+        except BreakerOpen:
+            break
+        except Exception as e:
+            print(f"Sammelabruf fehlgeschlagen ({len(batch)} Ticker): {e}")
+            continue
+        wanted = {s.upper(): s for s in batch}
+        for quote in quotes:
+            symbol = wanted.get(str(quote.get("symbol", "")).upper())
+            if symbol is not None:
+                out[symbol] = quote
+    for symbol, info in out.items():
+        if not (info.get("regularMarketPrice") or info.get("currentPrice")) and closes.get(symbol):
+            info["regularMarketPrice"] = closes[symbol]
+    return out
+
+def prefetch_info(tickers, series=None, stats=NO_STATS):
+    """info-Daten per Sammelabruf in den Cache; Einzelabrufe nur noch für Lücken.
+
+    Ticker mit Schlusskurs in `series` brauchen bei nur abgelaufenem Kurs
+    keinen Abruf – den Kurs liefert dann die Tageshistorie.
+    """
+    closes = {}
+    for t in tickers:
+        close = (series or _no_series)(t)[0]
+        if close is not None and not close.dropna().empty:
+            closes[t] = float(close.dropna().iloc[-1])
+    with stats.stage("info_batch"):
+        return INFO_CACHE.prefetch(tickers, lambda symbols: fetch_quotes(symbols, closes, stats),
+                                   has_quote=closes)
+
+def _dividend_sum(stock, stats=NO_STATS):
+    history = _guarded("history", lambda: stock.history(period="1y", actions=True, auto_adjust=True), stats)
+    if history.empty or "Dividends" not in history.columns:
+        return 0.0
+    return float(history["Dividends"].sum())
+
+def _now():
+    return datetime.datetime.now().strftime("%H:%M:%S")
+
+def _error_raw(ticker, error):
+    return {"ticker": ticker, "symbol": ticker, "name": ticker, "currency": None,
+            "unit": 1.0, "price": None, "div_rate": None, "div_yield": None,
+            "div_history": None, "error": str(error), "time": _now()}
+
+def fetch_raw(ticker, close=None, dividends=None, stats=NO_STATS):
+    """Alle Netz-Rohdaten eines Tickers; Beträge in der Hauptwährung.
+
+    `close` und `dividends` sind optionale, bereits geladene Tagesreihen
+    (Bulk-Download). Sie liefern den Kurs, wenn Yahoo keine Stammdaten hat,
+    und ersetzen den Historien-Abruf für die Dividende. `stats` erhält
+    Stufenzeiten, Aufrufe und Cache-Treffer (siehe perf_stats).
+    """
+    stamp = _now()
+    stock = yf.Ticker(ticker)
+    close = close.dropna() if close is not None else None
+    last_close = float(close.iloc[-1]) if close is not None and not close.empty else None
+
+    misses = []
+
+    def info_fetch():
+        misses.append("info")
+        return safe_info(stock, stats=stats)
+
+    def quote():
+        misses.append("quote")
+        if last_close is not None:
+            return {"regularMarketPrice": last_close}
+        return {"regularMarketPrice": _guarded("quote", lambda: stock.fast_info["last_price"], stats)}
+
+    error = None
+    with stats.stage("info", ticker):
+        try:
+            info = INFO_CACHE.get_info(ticker, info_fetch, quote)
+        except Exception as e:
+            info, error = {}, str(e)
+    stats.cache_lookup("info", not misses)
+
+    if info:
+        name     = info.get("longName") or info.get("shortName") or info.get("symbol") or ticker
+        price    = info.get("regularMarketPrice") or info.get("currentPrice")
+        currency = info.get("currency", "USD")
+    else:
+        # Ohne Stammdaten ist die Börsenwährung unbekannt (USD, Pence …) – der
+        # Schlusskurs bleibt in den Rohdaten, wird aber nicht als € ausgegeben
+        name, price, currency = ticker, last_close, None
+        error = error or "Keine Stammdaten (Währung unbekannt)"
+
+    # Kurse in Pence/Cent auf die Hauptwährung umrechnen
+    currency, unit = major_currency(currency)
+    price = price * unit if price else None
+
+    div_rate = info.get("trailingAnnualDividendRate") or 0
+    div_rate = div_rate * unit if div_rate > 0 else None
+    # dividendYield liefern beide Endpunkte (v7-quote und info) in Prozent –
+    # auch Renditen unter 1 %, daher ohne Größen-Heuristik umrechnen
+    div_yield = info.get("dividendYield") or 0
+    div_yield = div_yield / 100 if div_yield > 0 else None
+
+    # Historie nur, wenn Yahoo weder Dividende noch Rendite liefert
+    div_history = None
+    if error is None and not div_rate and not (div_yield and price):
+        with stats.stage("dividend_history", ticker):
+            try:
+                if dividends is not None:
+                    total = float(dividends.dropna().tail(HISTORY_ROWS).sum())
+                else:
+                    missed = []
+
+                    def history_fetch():
+                        missed.append(True)
+                        return _dividend_sum(stock, stats)
+
+                    total = INFO_CACHE.get_group(ticker, "dividend_history", history_fetch)
+                    stats.cache_lookup("dividend_history", not missed)
+                div_history = total * unit if total > 0 else None
+            except Exception:
+                pass
+
+    return {"ticker": ticker, "symbol": info.get("symbol", ticker), "name": name,
+            "currency": currency, "unit": unit, "price": price, "div_rate": div_rate,
+            "div_yield": div_yield, "div_history": div_history,
+            "error": error, "time": stamp}
+
+
+# ───────── Rendite ────────────────────────────────────────────
+def find_override(overrides, raw):
+    """Manuelle Dividende (in €) für den eingegebenen oder aufgelösten Ticker.
+
+    Override-Schlüssel dürfen auch WKN, ISIN oder Alias sein; die Zuordnung
+    zum Ticker hält OverrideValues je Dateistand bereit.
+    """
+    if not overrides:
+        return None
+    if not isinstance(overrides, OverrideValues):
+        overrides = OverrideValues(overrides)
+    by_ticker = overrides.by_ticker
+    value = by_ticker.get(raw["ticker"])
+    return value if value is not None else by_ticker.get(raw["symbol"])
+
+def raws_for_overrides(raws, keys):
+    """Rohdaten, die zu den Override-Schlüsseln `keys` gehören (gleiche Zuordnung wie find_override)."""
+    wanted = set(keys)
+    wanted.update(SYMBOLS.resolve(key) for key in list(wanted))
+    wanted.discard(None)
+    return [raw for raw in raws if raw["ticker"] in wanted or raw["symbol"] in wanted]
+
+def derive(raw, override=None, fx_rate=None):
+    """Ergebniszeile aus Rohdaten: Override → Dividende → Rendite → Historie."""
+    row = ResultRow(ticker=raw["ticker"], symbol=raw["symbol"], name=raw["name"],
+                    currency=raw["currency"], override=override is not None,
+                    error=raw["error"], time=raw["time"])
+    if raw["error"] and raw["price"] is None:
+        row.name = f"Fehler bei '{raw['ticker']}'"
+        return row
+
+    if fx_rate is not None:
+        rate = fx_rate
+    else:
+        rate = FX.rate(raw["currency"]) if raw["currency"] else None   # None = Währung unbekannt
+    price = raw["price"]
+    price_eur = round(price * rate, 2) if price and rate else None
+
+    if override is not None:
+        dividend_eur = float(override)   # Overrides sind bereits in €
+    else:
+        div = (raw["div_rate"]
+               or (price * raw["div_yield"] if raw["div_yield"] and price else None)
+               or raw["div_history"])
+        dividend_eur = round(div * rate, 2) if div and rate else None
+
+    row.price_eur = price_eur
+    row.dividend_eur = dividend_eur
+    if dividend_eur and dividend_eur > 0 and price_eur and price_eur > 0:
+        row.yield_pct = dividend_eur / price_eur * 100
+    return row
+
+def fetch_raw_safe(ticker, close=None, dividends=None, stats=NO_STATS):
+    try:
+        return fetch_raw(ticker, close, dividends, stats)
+    except Exception as e:
+        print(f"Fehler bei der Verarbeitung von '{ticker}': {e}")
+        return _error_raw(ticker, e)
+
+def analyze_ticker(ticker, overrides=None, close=None, dividends=None):
+    raw = fetch_raw_safe(ticker, close, dividends)
+    return derive(raw, find_override(overrides, raw))
+
+def _no_series(ticker):
+    return None, None
+
+def fetch_all(tickers, workers=MAX_WORKERS, series=None, progress=None, stats=None):
+    """Rohdaten aller Ticker parallel, in Eingabe-Reihenfolge.
+
+    Danach werden alle benötigten Wechselkurse in einem Abruf geholt, so
+    dass derive() für diese Rohdaten ohne Netz auskommt. `series(ticker)`
+    liefert optional (close, dividends), `progress(done, total)` wird nach
+    jedem Ticker aufgerufen.
+    """
+    tickers = list(tickers)
+    series = series or _no_series
+    stats = stats or NO_STATS
+    prefetch_info(tickers, series, stats)
+    raws = [None] * len(tickers)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tickers) or 1))) as pool:
+        futures = {pool.submit(fetch_raw_safe, t, *series(t), stats): i for i, t in enumerate(tickers)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            raws[futures[future]] = future.result()
+            if progress:
+                progress(done, len(tickers))
+    with stats.stage("fx"):
+        FX.prefetch({r["currency"] for r in raws if r["currency"]})
+    return raws
+
+def analyze(tickers, overrides=None, workers=MAX_WORKERS, series=None, progress=None):
+    """Alle Ticker abrufen und auswerten; Zeilen in Eingabe-Reihenfolge."""
+    raws = fetch_all(tickers, workers, series, progress)
+    return [derive(r, find_override(overrides, r)) for r in raws]
+
+def _prefetched(tickers, series, stats):
+    """Ticker blockweise weiterreichen, vor jedem Block ein Sammelabruf."""
+    while True:
+        block = list(itertools.islice(tickers, QUOTE_BATCH))
+        if not block:
+            return
+        prefetch_info(block, series, stats)
+        yield from block
+
+def iter_raw(tickers, workers=MAX_WORKERS, series=None, stats=None):
+    """Rohdaten in Fertigstellungs-Reihenfolge streamen.
+
+    Es sind nie mehr als 2 × `workers` Ticker gleichzeitig in Arbeit, und
+    `tickers` wird erst bei Bedarf weitergelesen – der Speicherbedarf bleibt
+    damit auch bei sehr langen Listen konstant. Die info-Daten werden je
+    QUOTE_BATCH Ticker vorab per Sammelabruf geladen.
+    """
+    series = series or _no_series
+    stats = stats or NO_STATS
+    tickers = _prefetched(iter(tickers), series, stats)
+
+    def submit(pool, ticker):
+        return pool.submit(fetch_raw_safe, ticker, *series(ticker), stats)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = {submit(pool, t) for t in itertools.islice(tickers, 2 * workers)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                ticker = next(tickers, None)
+                if ticker is not None:
+                    pending.add(submit(pool, ticker))
+
+def iter_rows(tickers, overrides=None, workers=MAX_WORKERS, series=None):
+    """Wie iter_raw(), aber gleich als ausgewertete Zeilen."""
+    for raw in iter_raw(tickers, workers, series):
+        yield derive(raw, find_override(overrides, raw))
+
+
+# ───────── Dashboard-Ablauf ───────────────────────────────────
+CHANGE_SPANS = {"1d": 1, "7d": 7, "30d": 30, "365d": 365}
+
+def pct_changes(close_df):
+    """Veränderung in % je Ticker (Zeilen) und Zeitraum (Spalten), alle auf einmal.
+
+    Vergleichswert ist – wie bisher – der erste Kurs am oder nach
+    „letzter Kurstag minus Zeitraum“.
+    """
+    if close_df.empty:
+        return pd.DataFrame(columns=list(CHANGE_SPANS), dtype=float)
+    close_df = close_df.sort_index()
+    vals   = close_df.to_numpy(dtype="float64")
+    valid  = ~np.isnan(vals)
+    cols   = np.arange(vals.shape[1])
+    last   = len(vals) - 1 - np.argmax(valid[::-1], axis=0)   # letzte gültige Zeile je Spalte
+    latest = vals[last, cols]
+    filled = close_df.bfill().to_numpy(dtype="float64")
+    dates  = close_df.index.values
+    out = {}
+    for name, days in CHANGE_SPANS.items():
+        pos  = np.searchsorted(dates, dates[last] - np.timedelta64(days, "D"))
+        past = filled[pos, cols]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[name] = np.where(past > 0, (latest - past) / past * 100, np.nan)
+    res = pd.DataFrame(out, index=close_df.columns)
+    res[valid.sum(axis=0) < 2] = np.nan
+    return res
+
+def _find_series(df, ticker):
+    """Spalte eines Tickers (auch bei abweichender Groß-/Kleinschreibung)."""
+    if ticker in df:
+        return df[ticker].dropna()
+    real = {c.upper(): c for c in df.columns}.get(ticker.upper())
+    return df[real].dropna() if real else pd.Series(dtype="float64")
+
+def analyze_portfolio(tickers, overrides=None, workers=MAX_WORKERS, history=None, stats=None):
+    """Ablauf des Dashboards: Historie ergänzen, Rohdaten, Renditen, Veränderungen.
+
+    Liefert (numerische Ergebnistabelle absteigend nach 1d-Veränderung,
+    Rohdaten in Eingabe-Reihenfolge). Die lokale Historie dient als
+    Ersatzkurs und als Quelle der Dividendensumme.
+    """
+    history = history or HISTORY
+    stats = stats or NO_STATS
+    with stats.stage("history_update"):
+        history.update(tickers)
+    with stats.stage("history_frames"):
+        close_df, div_df = history.frames(tickers)
+
+    def series(t):
+        return _find_series(close_df, t), (div_df[t] if t in div_df else None)
+
+    raws = fetch_all(tickers, workers, series, stats=stats)
+    rows = []
+    for r in raws:
+        with stats.stage("derive", r["ticker"]):
+            rows.append(derive(r, find_override(overrides, r)))
+    with stats.stage("changes"):
+        df = results_frame(rows).join(pct_changes(close_df), on="Ticker")
+        df.sort_values("1d", ascending=False, na_position="last", inplace=True)
+    return df, raws
+
+
+# ───────── Renditeverlauf ─────────────────────────────────────
+YIELD_YEARS = 3
+YIELD_WINDOW = "365D"               # rollierende 12 Monate (Kalendertage)
+YIELD_QUANTILES = (0.1, 0.5, 0.9)
+
+def rolling_yield(close_df, div_df, fx_df=None, window=YIELD_WINDOW):
+    """Tägliche 12-Monats-Dividende (€) und Rendite (%) für alle Ticker auf einmal.
+
+    `close_df`/`div_df`: Kurse und Ausschüttungen in Börsenwährung (Spalten =
+    Ticker), `fx_df`: Faktor Börsenwährung → € je Tag und Ticker (gleiche
+    Spalten; fehlt er, bleibt die Dividende in Börsenwährung). Werte vor
+    Ablauf des ersten vollen Fensters sind NaN.
+    """
+    close_df = close_df.sort_index()
+    divs = div_df.reindex(index=close_df.index, columns=close_df.columns).fillna(0.0)
+    ttm = divs.rolling(window).sum()
+    # erst ab einem vollen Fenster nach dem ersten Kurs aussagekräftig
+    first = close_df.notna().idxmax().to_numpy(dtype="datetime64[ns]")
+    ready = close_df.index.values[:, None] >= first[None, :] + pd.Timedelta(window).to_timedelta64()
+    ttm = ttm.where(ready)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yield_pct = ttm / close_df.where(close_df > 0) * 100
+    if fx_df is not None:
+        fx = fx_df.reindex(index=close_df.index, columns=close_df.columns).ffill().bfill()
+        ttm = ttm * fx
+    return ttm, yield_pct
+
+def yield_bands(yield_pct, quantiles=YIELD_QUANTILES):
+    """Aktuelle Rendite, Perzentil-Bänder und Perzentilrang der heutigen Rendite je Ticker."""
+    columns = ["Aktuell (%)", *(f"P{round(q * 100)} (%)" for q in quantiles), "Perzentil"]
+    if yield_pct.empty:
+        return pd.DataFrame(columns=columns, dtype="float64")
+    vals = yield_pct.to_numpy(dtype="float64")
+    valid = ~np.isnan(vals)
+    has = valid.any(axis=0)
+    cols = np.arange(vals.shape[1])
+    last = len(vals) - 1 - np.argmax(valid[::-1], axis=0)
+    current = np.where(has, vals[last, cols], np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)   # Ticker ohne Verlauf
+        bands = np.nanquantile(vals, quantiles, axis=0)
+    counts = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rank = np.where(counts > 0, (vals <= current).sum(axis=0) / counts * 100, np.nan)
+    return pd.DataFrame(np.column_stack([current, *bands, rank]), index=yield_pct.columns, columns=columns)
+
+def _fx_pair(currency):
+    return f"{currency}EUR=X" if currency and currency != "EUR" else None
+
+def fx_frame(currencies, index, days, history=None):
+    """Tägliche Kurse Börsenwährung → € je Ticker (Spalten), auf `index` ausgerichtet; EUR = 1."""
+    history = history or HISTORY
+    pairs = {t: _fx_pair(c) for t, c in currencies.items()}
+    fx_close = history.frames(sorted({p for p in pairs.values() if p}), days=days)[0]
+    fx = pd.DataFrame(1.0, index=index, columns=list(currencies))
+    cols = [t for t, p in pairs.items() if p in fx_close]
+    if cols:
+        # Kurs des letzten FX-Handelstags am oder vor jedem Datum
+        aligned = fx_close.reindex(fx_close.index.union(index)).sort_index().ffill().bfill().reindex(index)
+        fx[cols] = aligned[[pairs[t] for t in cols]].to_numpy()
+    return fx
+
+def yield_history(raws, years=YIELD_YEARS, history=None):
+    """Renditeverlauf der analysierten Ticker; Kurse und FX aus der lokalen Historie.
+
+    Liefert (12-Monats-Dividende in €, Rendite in %, Bänder je Ticker).
+    """
+    history = history or HISTORY
+    days = (years + 1) * 365
+    tickers = [r["ticker"] for r in raws]
+    currencies = {r["ticker"]: r["currency"] for r in raws}
+    raw_units = {r["ticker"]: r.get("unit") or 1.0 for r in raws}
+    pairs = sorted({p for p in map(_fx_pair, currencies.values()) if p})
+    history.update(tickers + pairs, days=days)
+    close_df, div_df = history.frames(tickers, days=days)
+    if close_df.empty:
+        return pd.DataFrame(), pd.DataFrame(), yield_bands(pd.DataFrame())
+    # Untereinheiten (Pence) und Wechselkurs als ein Faktor je Tag und Ticker
+    units = np.array([raw_units.get(t, 1.0) for t in close_df.columns])
+    fx = fx_frame({t: currencies.get(t) for t in close_df.columns}, close_df.index, days, history) * units
+    ttm_eur, yield_pct = rolling_yield(close_df, div_df, fx)
+    first = close_df.index[-1] - pd.Timedelta(days=years * 365)
+    ttm_eur, yield_pct = ttm_eur[ttm_eur.index >= first], yield_pct[yield_pct.index >= first]
+    return ttm_eur, yield_pct, yield_bands(yield_pct)
+
+
+# ───────── Anzeige ────────────────────────────────────────────
+def results_frame(rows):
+    """Numerische Ergebnistabelle (float-Spalten, NaN = unbekannt) plus Status-Flags."""
+    rows = list(rows)
+    data = {col: [getattr(r, field) for r in rows] for col, field in COLUMN_FIELDS.items()}
+    df = pd.DataFrame(data, columns=list(COLUMN_FIELDS))
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col]).astype("float64")
+    df["Override"] = [bool(r.override) for r in rows]
+    df["Fehler"] = [r.has_error for r in rows]
+    return df
+
+
+# ───────── Kommandozeile ──────────────────────────────────────
+def _writer(fmt, out):
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=ROW_FIELDS)
+        writer.writeheader()
+        return writer.writerow
+    return lambda row: out.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dividendenrenditen ohne Oberfläche berechnen.")
+    parser.add_argument("tickers", nargs="*", help="Ticker; ohne Angabe aus --file bzw. config.txt")
+    parser.add_argument("-f", "--file", help="Datei mit Tickern ('-' = Standardeingabe)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    parser.add_argument("-w", "--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--overrides", default=OVERRIDE_FILE, help="JSON-Datei mit manuellen Dividenden")
+    parser.add_argument("-o", "--output", help="in Datei schreiben (.csv/.parquet/.xlsx) statt Standardausgabe")
+    parser.add_argument("--snapshot", action="store_true", help=f"Lauf an den Renditeverlauf ({SNAPSHOT_DIR}/) anhängen")
+    args = parser.parse_args(argv)
+
+    if args.tickers:
+        source = args.tickers
+    elif args.file == "-":
+        source = sys.stdin
+    else:
+        source = open(args.file or CONFIG_FILE, "r", encoding="utf-8")
+
+    # Standardausgabe nur ohne -o – sonst stünde dort ein CSV-Kopf ohne Zeilen
+    write = _writer(args.format, sys.stdout) if not args.output else None
+    overrides = load_overrides(args.overrides)
+    try:
+        with contextlib.ExitStack() as sinks:
+            exports = []
+            if args.output:
+                exports.append(sinks.enter_context(open_export(args.output)))
+            if args.snapshot:
+                exports.append(sinks.enter_context(snapshot_export()))
+            for row in iter_rows(resolve_tickers(iter_tickers(source)), overrides, args.workers):
+                for out in exports:
+                    out.add(row)
+                if write is not None:
+                    write(row.as_dict())
+                    sys.stdout.flush()
+    finally:
+        if hasattr(source, "close") and source is not sys.stdin:
+            source.close()
+
+if __name__ == "__main__":
+    main()
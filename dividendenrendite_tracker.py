@@ -1,15 +1,46 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import yfinance as yf
-import pandas as pd
+from tkinter import ttk, messagebox, filedialog, simpledialog
 import threading
 import datetime
 import os
-import json
+import queue
+import bisect
+
+# Nur leichte Module beim Start; pandas/yfinance (dividend_engine) und numpy
+# werden erst im Analyse-Thread bzw. beim Sortieren geladen
+from override_store import OVERRIDES
+from perf_stats import NO_STATS, RunStats, format_summary
+from prefetch_scheduler import PrefetchScheduler, config_tickers, prefetch_enabled
+from result_rows import COLUMN_FIELDS, NUMERIC_COLUMNS, format_row, load_snapshot, save_snapshot
+from symbol_index import SYMBOLS
 
 CONFIG_FILE = "config.txt"
-OVERRIDE_FILE = "dividend_overrides.json"
 DEFAULT_TICKERS = "VOW3.DE, INGA.AS, LHA.DE, NEDAP.AS, VICI, KMI, O, ENB, ECMPA.AS, NCCB.ST, SAN, COLD, VEI.OL, ALV.DE, DG.PA, SCMN.SW, IMB.L, ITX.MC, NESN.SW, SAN.PA"
+# Ergebnis-Queue: alle POLL_MS ms höchstens POLL_BATCH Zeilen in den Treeview übernehmen
+POLL_MS = 50
+POLL_BATCH = 200
+DEFAULT_SORT = ("Dividendenrendite (%)", True)   # Spalte, absteigend
+# Ticker aus config.txt im Hintergrund aktuell halten – nur mit DIVIDENDEN_PREFETCH=1
+# (siehe prefetch_scheduler.py)
+BACKGROUND_PREFETCH = prefetch_enabled()
+# Voreinstellung „Läufe speichern“: Analyse-Läufe an den Renditeverlauf anhängen (yield_history/)
+RECORD_RUNS = False
+EXPORT_TYPES = [("CSV (Semikolon, Dezimalkomma)", "*.csv"), ("CSV (Komma, Dezimalpunkt)", "*.csv"),
+                ("Parquet", "*.parquet"), ("Excel", "*.xlsx")]
+
+
+class _Descending:
+    """Kehrt die Ordnung eines Textschlüssels um (für bisect bei absteigender Sortierung)."""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
 
 def load_defaults():
     if not os.path.exists(CONFIG_FILE):
@@ -28,37 +59,28 @@ def load_defaults():
         print(f"Fehler beim Laden der Konfiguration: {e}")
         return DEFAULT_TICKERS
 
-def get_fx_rate_yahoo(src="USD", dst="EUR"):
-    if src == dst:
-        return 1.0
+def open_run_export():
+    """Writer des Renditeverlaufs für einen Lauf (None, wenn nicht möglich)."""
+    from result_export import ExportError, snapshot_export
     try:
-        pair = f"{src}{dst}=X"
-        fx = yf.Ticker(pair)
-        fxdata = fx.history(period="1d")
-        rate = fxdata["Close"].iloc[-1]
-        return float(rate)
-    except Exception as e:
-        print(f"Wechselkurs-Fehler {src}->{dst}: {e}")
-        return 1.0
+        return snapshot_export()
+    except (ExportError, OSError) as e:
+        print(f"Renditeverlauf nicht geschrieben: {e}")
+        return None
 
-def load_overrides():
-    if os.path.exists(OVERRIDE_FILE):
+def close_run_export(run_export):
+    from result_export import ExportError
+    if run_export is not None:
         try:
-            with open(OVERRIDE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
-
-def save_overrides(overrides):
-    with open(OVERRIDE_FILE, "w", encoding="utf-8") as f:
-        json.dump(overrides, f, ensure_ascii=False, indent=2)
+            run_export.close()
+        except (ExportError, OSError) as e:
+            print(f"Renditeverlauf nicht geschrieben: {e}")
 
 class ManualDividendDialog(tk.Toplevel):
     def __init__(self, parent, company_ticker_map, overrides, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
         self.title("Dividende manuell erfassen")
-        self.geometry("400x180")
+        self.geometry("400x200")
         self.grab_set()
         self.resizable(False, False)
         self.company_ticker_map = company_ticker_map
@@ -81,6 +103,8 @@ class ManualDividendDialog(tk.Toplevel):
         if ticker in overrides:
             self.value_entry.insert(0, str(overrides[ticker]))
         self.value_entry.pack(pady=2)
+        self.history_var = tk.StringVar(value=self.history_text(ticker))
+        ttk.Label(self, textvariable=self.history_var, foreground="grey").pack()
 
         self.dropdown.bind("<<ComboboxSelected>>", self.on_company_change)
 
@@ -97,6 +121,15 @@ class ManualDividendDialog(tk.Toplevel):
         self.value_entry.delete(0, tk.END)
         if ticker in self.overrides:
             self.value_entry.insert(0, str(self.overrides[ticker]))
+        self.history_var.set(self.history_text(ticker))
+
+    @staticmethod
+    def history_text(ticker):
+        changes = OVERRIDES.history(ticker)[-3:]
+        if not changes:
+            return ""
+        return "Zuletzt: " + ", ".join(
+            f"{stamp[:10]} {'gelöscht' if value is None else f'€ {value:.2f}'}" for stamp, value in reversed(changes))
 
     def on_ok(self):
         company = self.selected_company.get()
@@ -116,30 +149,42 @@ class DividendTrackerApp(tk.Tk):
         self.ticker_input = ttk.Entry(self.ticker_frame, font=("Helvetica", 12))
         self.ticker_input.pack(pady=5, padx=10, fill="x")
         self.ticker_input.insert(0, load_defaults())
+        self.prefetcher = None
 
         self.button_frame = ttk.Frame(self)
         self.button_frame.pack(padx=10, pady=5, fill="x")
         # Links: Analyse starten
         self.analyze_button = ttk.Button(self.button_frame, text="Analyse starten", command=self.start_analysis_thread)
         self.analyze_button.pack(side="left", padx=5)
+        self.screener_button = ttk.Button(self.button_frame, text="Universum screenen …", command=self.start_screener_thread)
+        self.screener_button.pack(side="left", padx=5)
         # Rechts: Dividende manuell erfassen, dann alle löschen
         self.override_button = ttk.Button(self.button_frame, text="Dividende manuell erfassen", command=self.set_manual_dividend)
         self.override_button.pack(side="right", padx=5)
         self.clear_overrides_button = ttk.Button(self.button_frame, text="Alle manuellen Dividenden löschen", command=self.clear_all_overrides)
         self.clear_overrides_button.pack(side="right", padx=5)
+        self.perf_button = ttk.Button(self.button_frame, text="Performance", command=self.show_performance)
+        self.perf_button.pack(side="right", padx=5)
+        self.export_button = ttk.Button(self.button_frame, text="Exportieren …", command=self.export_results)
+        self.export_button.pack(side="right", padx=5)
+        self.record_var = tk.BooleanVar(value=RECORD_RUNS)
+        self.record_check = ttk.Checkbutton(self.button_frame, text="Läufe speichern", variable=self.record_var)
+        self.record_check.pack(side="right", padx=5)
 
         self.progress_bar = ttk.Progressbar(self, orient="horizontal", length=100, mode="determinate")
         self.progress_bar.pack(pady=5, padx=10, fill="x")
+        self.status_var = tk.StringVar(value="Bereit.")
+        self.status_label = ttk.Label(self, textvariable=self.status_var, anchor="w")
+        self.status_label.pack(padx=10, fill="x")
 
         self.tree_frame = ttk.LabelFrame(self, text="Ergebnisse (manuelle Dividende = dezent markiert)")
         self.tree_frame.pack(padx=10, pady=10, expand=True, fill="both")
 
         self.columns = ("Unternehmen", "Ticker", "Kurs (€)", "Jahresdividende (€)", "Dividendenrendite (%)", "Stand")
         self.tree = ttk.Treeview(self.tree_frame, columns=self.columns, show="headings", selectmode="browse")
-        numeric_columns = ["Kurs (€)", "Jahresdividende (€)", "Dividendenrendite (%)"]
         for col in self.columns:
-            self.tree.heading(col, text=col)
-            if col in numeric_columns:
+            self.tree.heading(col, text=col, command=lambda _col=col: self.sort_by_column(_col, _col in NUMERIC_COLUMNS))
+            if col in NUMERIC_COLUMNS:
                 anchor = 'e'
             elif col == "Stand":
                 anchor = 'center'
@@ -149,16 +194,55 @@ class DividendTrackerApp(tk.Tk):
         self.tree.column("Stand", width=100)
         self.tree.pack(expand=True, fill="both")
         self.results_df = None
-        self.dividend_overrides = load_overrides()
+        # Worker-Threads liefern nur in diese Queue; Tk wird ausschließlich im Hauptthread geändert
+        self.result_queue = queue.Queue()
+        self.raws = {}          # Ticker → Rohdaten aus dem Netz (unabhängig von Overrides)
+        self.rows = {}          # Ticker → ResultRow
+        self.row_items = {}     # Ticker → Treeview-Item
+        self.sort_spec = DEFAULT_SORT
+        self.sort_keys = []     # Sortierschlüssel in Treeview-Reihenfolge (siehe sort_spec)
+        self.rows_received = 0
+        self.run_stats = None   # RunStats des laufenden bzw. letzten Laufs
+        self.screening = False  # Tabelle zeigt eine Screener-Rangliste (kein Snapshot)
 
         # Dezente Markierung für Overrides
         self.tree.tag_configure("override", background="#2A3B4D", foreground="#F9F9F9")
+        # Zeilen aus dem Snapshot, bis die Aktualisierung sie ersetzt
+        self.tree.tag_configure("stale", foreground="#888888")
+        self.stale_tickers = set()
+
+        if self.show_snapshot():
+            self.after(0, lambda: self.start_analysis_thread(keep_rows=True))
+        if BACKGROUND_PREFETCH:
+            threading.Thread(target=self.start_prefetch, daemon=True).start()
+
+    def start_prefetch(self):
+        # Eigener Thread: config_tickers() lädt die Engine (pandas, yfinance);
+        # der Scheduler liest config.txt bei jeder Prüfung neu
+        self.prefetcher = PrefetchScheduler(source=lambda: config_tickers(CONFIG_FILE)).start()
+
+    def show_snapshot(self):
+        """Letztes Ergebnis sofort anzeigen, als veraltet markiert."""
+        saved, rows = load_snapshot()
+        if not rows:
+            return False
+        for row in rows:
+            self.upsert_row(row)
+        self.stale_tickers = {row.ticker for row in rows}
+        for ticker in self.stale_tickers:
+            self.tree.item(self.row_items[ticker], tags=("stale",))
+        self.status_var.set(f"Stand vom {saved:%d.%m.%Y %H:%M} (veraltet) – wird aktualisiert …")
+        return True
+
+    @property
+    def dividend_overrides(self):
+        # gemeinsame Datei; neu eingelesen nur, wenn sie sich geändert hat
+        return OVERRIDES.values()
 
     def clear_all_overrides(self):
-        if os.path.exists(OVERRIDE_FILE):
-            os.remove(OVERRIDE_FILE)
-        self.dividend_overrides = {}
-        self.start_analysis_thread()
+        affected = list(self.dividend_overrides)
+        OVERRIDES.clear()
+        self.rederive(affected)
 
     def set_manual_dividend(self):
         if self.results_df is None or self.results_df.empty:
@@ -170,165 +254,290 @@ class DividendTrackerApp(tk.Tk):
         self.wait_window(dialog)
         if dialog.result:
             ticker, value = dialog.result
-            if value == "":
-                if ticker in self.dividend_overrides:
-                    del self.dividend_overrides[ticker]
-            else:
-                try:
-                    self.dividend_overrides[ticker] = float(value)
-                except Exception:
-                    messagebox.showerror("Fehler", f"Ungültiger Wert für {ticker}: {value}")
-                    return
-            save_overrides(self.dividend_overrides)
-            self.start_analysis_thread()
-
-    def start_analysis_thread(self):
+            try:
+                OVERRIDES.set(ticker, float(value) if value else None)
+            except ValueError:
+                messagebox.showerror("Fehler", f"Ungültiger Wert für {ticker}: {value}")
+                return
+            except OSError as e:
+                messagebox.showerror("Fehler", f"Overrides konnten nicht gespeichert werden: {e}")
+                return
+            self.rederive([ticker])
+
+    def start_analysis_thread(self, keep_rows=False):
+        # keep_rows: vorhandene (Snapshot-)Zeilen stehen lassen, bis neue sie ersetzen
+        # Beide Läufe teilen sich result_queue – während der Analyse kein Screening
         self.analyze_button.config(state="disabled")
-        for i in self.tree.get_children():
-            self.tree.delete(i)
+        self.screener_button.config(state="disabled")
+        if not keep_rows:
+            self.clear_rows()
         identifiers = [identifier.strip().upper() for identifier in self.ticker_input.get().split(',') if identifier.strip()]
         if not identifiers:
             messagebox.showwarning("Eingabe fehlt", "Bitte geben Sie mindestens einen Ticker ein (z.B. SAP.DE, MSFT, O, IMB.L).")
             self.analyze_button.config(state="normal")
+            self.screener_button.config(state="normal")
             return
-        for ticker in identifiers:
-            if len(ticker) == 6 and ticker.isalnum() and '.' not in ticker:
-                messagebox.showerror("Ungültige Eingabe", f"'{ticker}' sieht wie eine WKN aus. Bitte geben Sie NUR Ticker ein (z.B. SAP.DE, MSFT, O, IMB.L).")
-                self.analyze_button.config(state="normal")
-                return
-            if len(ticker) == 12 and ticker[:2].isalpha() and ticker[2:].isalnum():
-                messagebox.showerror("Ungültige Eingabe", f"'{ticker}' sieht wie eine ISIN aus. Bitte geben Sie NUR Ticker ein (z.B. SAP.DE, MSFT, O, IMB.L).")
-                self.analyze_button.config(state="normal")
-                return
+        # WKN/ISIN/Aliasse offline über den Symbolindex in Yahoo-Ticker übersetzen
+        resolved = [SYMBOLS.resolve(identifier) for identifier in identifiers]
+        unknown = [identifier for identifier, ticker in zip(identifiers, resolved) if ticker is None]
+        if unknown:
+            messagebox.showerror("Unbekannte Kennung", f"Nicht im Symbolindex gefunden: {', '.join(unknown)}.\nBitte den Yahoo-Ticker eingeben (z.B. SAP.DE, MSFT, O, IMB.L) oder symbols.csv ergänzen.")
+            self.analyze_button.config(state="normal")
+            self.screener_button.config(state="normal")
+            return
+        identifiers = list(dict.fromkeys(resolved))
         self.progress_bar["value"] = 0
         self.progress_bar["maximum"] = len(identifiers)
-        thread = threading.Thread(target=self.fetch_data, args=(identifiers,))
+        self.rows_received = 0
+        self.run_stats = RunStats("tk")
+        self.run_identifiers = set(identifiers)
+        self.screening = False
+        if not keep_rows:
+            self.status_var.set(f"Analyse läuft: {len(identifiers)} Ticker …")
+        thread = threading.Thread(target=self.fetch_data, args=(identifiers, None, self.run_stats, self.record_var.get()),
+                                  daemon=True)
         thread.start()
+        self.after(POLL_MS, self.poll_results)
 
-    def fetch_data(self, identifiers):
-        results = []
-        for i, ticker in enumerate(identifiers):
-            timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+    def fetch_data(self, identifiers, max_workers=None, stats=None, record=False):
+        # Läuft im Worker-Thread: Zeilen nur in die Queue stellen, Tk nicht anfassen.
+        # Auch der Renditeverlauf (record) wird hier geschrieben – pyarrow lädt erst hier.
+        from dividend_engine import MAX_WORKERS, derive, find_override, iter_raw
+        max_workers = max_workers or MAX_WORKERS
+        stats = stats or NO_STATS
+        run_export = open_run_export() if record else None
+        try:
+            for raw in iter_raw(identifiers, workers=max_workers, stats=stats):
+                with stats.stage("derive", raw["ticker"]):
+                    row = derive(raw, find_override(self.dividend_overrides, raw))
+                if run_export is not None:
+                    run_export.add(row)
+                self.result_queue.put(("row", (raw, row)))
+            close_run_export(run_export)
+            run_export = None
+        finally:
+            if run_export is not None:
+                run_export.discard()
+            self.result_queue.put(("done", None))
+
+    def poll_results(self):
+        # Läuft im Tk-Hauptthread (per after()); übernimmt fertige Zeilen portionsweise
+        for _ in range(POLL_BATCH):
             try:
-                stock = yf.Ticker(ticker)
-                info = stock.info
-                company_name = info.get('longName') or info.get('shortName') or info.get('symbol') or ticker
-                resolved_ticker = info.get('symbol', ticker)
-                current_price = info.get('regularMarketPrice', info.get('currentPrice', 0))
-                currency_code = info.get('currency', 'USD')
-                # UK-Fix: Kurs und Dividende in Pence → Pfund
-                if ticker.endswith('.L') and currency_code == "GBp":
-                    if current_price:
-                        current_price = current_price / 100
-                    currency_code = "GBP"
-                fx_rate = get_fx_rate_yahoo(currency_code, "EUR") if currency_code != "EUR" else 1.0
-                display_symbol = "€"
-                price_eur = round(current_price * fx_rate, 2) if current_price else None
-
-                # Dividende: Erst Override (in Euro, direkt verwenden!), dann Yahoo, dann Historie
-                annual_dividend = self.dividend_overrides.get(ticker)
-                if annual_dividend is not None:
-                    dividend_eur = annual_dividend
-                else:
-                    annual_dividend = None
-                    direct_dividend = info.get('trailingAnnualDividendRate')
-                    if direct_dividend is not None and direct_dividend > 0:
-                        annual_dividend = direct_dividend
-                    if ticker.endswith('.L') and info.get('currency', '') == "GBp" and annual_dividend:
-                        annual_dividend = annual_dividend / 100
-                    if annual_dividend is None or annual_dividend == 0:
-                        dividend_yield = info.get('dividendYield')
-                        if dividend_yield is not None and dividend_yield > 0 and current_price and current_price > 0:
-                            if dividend_yield > 1:
-                                dividend_yield = dividend_yield / 100
-                            annual_dividend = current_price * dividend_yield
-                    if (annual_dividend is None or annual_dividend == 0):
-                        try:
-                            history = stock.history(period="1y", actions=True, auto_adjust=True)
-                            if not history.empty and 'Dividends' in history.columns:
-                                dividends_last_year = history['Dividends'].sum()
-                                if ticker.endswith('.L') and info.get('currency', '') == "GBp":
-                                    dividends_last_year = dividends_last_year / 100
-                                if dividends_last_year > 0:
-                                    annual_dividend = dividends_last_year
-                        except Exception:
-                            pass
-                    dividend_eur = round(annual_dividend * fx_rate, 2) if annual_dividend else None
-
-                dividend_found = dividend_eur is not None and dividend_eur > 0
-                if dividend_found and price_eur and price_eur > 0:
-                    yield_percent = (dividend_eur / price_eur) * 100
-                    dividend_str = f"{display_symbol} {dividend_eur:,.2f}"
-                    yield_str = f"{yield_percent:.2f}"
-                else:
-                    dividend_str = "N/A"
-                    yield_str = "N/A"
-                price_str = f"{display_symbol} {price_eur:,.2f}" if price_eur else "N/A"
-                results.append({
-                    "Unternehmen": company_name,
-                    "Ticker": resolved_ticker,
-                    "Kurs (€)": price_str,
-                    "Jahresdividende (€)": dividend_str,
-                    "Dividendenrendite (%)": yield_str,
-                    "Stand": timestamp
-                })
-            except Exception as e:
-                print(f"Fehler bei der Verarbeitung von '{ticker}': {e}")
-                results.append({
-                    "Unternehmen": f"Fehler bei '{ticker}'",
-                    "Ticker": ticker,
-                    "Kurs (€)": "N/A",
-                    "Jahresdividende (€)": "N/A",
-                    "Dividendenrendite (%)": "N/A",
-                    "Stand": timestamp
-                })
-            self.progress_bar["value"] = i + 1
-            self.update_idletasks()
-        self.results_df = pd.DataFrame(results)
-        self.display_results()
+                kind, item = self.result_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "done":
+                self.finish_analysis()
+                return
+            if kind == "screen_done":
+                self.finish_screening()
+                return
+            if kind == "board":
+                self.show_leaderboard(*item)
+                continue
+            raw, row = item
+            self.raws[raw["ticker"]] = raw
+            with (self.run_stats or NO_STATS).stage("render", row.ticker):
+                self.upsert_row(row)
+            self.rows_received += 1
+            self.progress_bar["value"] = self.rows_received
+        self.after(POLL_MS, self.poll_results)
+
+    def start_screener_thread(self):
+        path = filedialog.askopenfilename(title="Symboldatei wählen", filetypes=[("Textdateien", "*.txt *.csv"), ("Alle Dateien", "*.*")])
+        if not path:
+            return
+        min_yield = simpledialog.askfloat("Screener", "Mindestrendite in % (leer = keine):", parent=self, minvalue=0)
+        self.analyze_button.config(state="disabled")
+        self.screener_button.config(state="disabled")
+        self.clear_rows()
+        self.run_stats = None
+        self.run_identifiers = set()
+        self.screening = True
+        self.progress_bar["value"] = 0
+        self.progress_bar.config(mode="indeterminate")
+        self.progress_bar.start()
+        self.status_var.set("Screening läuft …")
+        thread = threading.Thread(target=self.screen_data, args=(path, min_yield), daemon=True)
+        thread.start()
+        self.after(POLL_MS, self.poll_results)
+
+    def screen_data(self, path, min_yield):
+        # Worker-Thread: nur Zwischenranglisten (Top-K) in die Queue, nie das ganze Universum
+        from dividend_engine import iter_tickers
+        from screener import TopK, screen
+        top = TopK()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for progress in screen(iter_tickers(f), min_yield=min_yield,
+                                       overrides=self.dividend_overrides, top=top):
+                    self.result_queue.put(("board", (progress, top.raws())))
+        except Exception as e:
+            print(f"Screener-Fehler: {e}")
+        finally:
+            self.result_queue.put(("screen_done", None))
+
+    def show_leaderboard(self, progress, raws):
+        """Tabelle durch die aktuelle Rangliste ersetzen."""
+        self._reset_tree()
+        self.raws = raws
+        for row in progress.leaders:
+            self.upsert_row(row)
+        state = "fertig" if progress.done else "läuft"
+        self.status_var.set(f"Screening {state}: {progress.scanned} gescannt, "
+                            f"{progress.matched} Treffer, {progress.errors} Fehler")
+
+    def finish_screening(self):
+        # Rangliste bleibt stehen; last_results.json gehört der Analyse
+        self.progress_bar.stop()
+        self.progress_bar.config(mode="determinate")
+        self.screener_button.config(state="normal")
+        self.refresh_results_df()
+        self.analyze_button.config(state="normal")
+
+    def finish_analysis(self):
+        self.screener_button.config(state="normal")
+        # Snapshot-Zeilen, die dieser Lauf nicht mehr enthält, entfernen
+        self.drop_rows([t for t in self.stale_tickers if t not in self.run_identifiers])
+        self.stale_tickers.clear()
+        self.refresh_results_df()
+        save_snapshot(self.rows[t] for t in self.row_order())
         self.analyze_button.config(state="normal")
+        if self.run_stats is not None:
+            summary = self.run_stats.finish().summary()
+            self.run_stats.write_log()
+            self.status_var.set(format_summary(summary).splitlines()[0]
+                                + f" | Upstream-Aufrufe: {summary['calls'].get('total', 0)}"
+                                + f" | Wiederholungen: {summary['retries']}")
+
+    def show_performance(self):
+        """Statusansicht: Kennzahlen und langsamste Ticker des letzten Laufs."""
+        if self.run_stats is None:
+            messagebox.showinfo("Hinweis", "Bitte zuerst eine Analyse starten.")
+            return
+        window = tk.Toplevel(self)
+        window.title("Performance")
+        window.geometry("700x450")
+        text = tk.Text(window, font=("Courier", 10), wrap="none")
+        text.pack(expand=True, fill="both")
+        lines = [format_summary(self.run_stats.summary()), "", "Langsamste Ticker:"]
+        for entry in self.run_stats.slowest(15):
+            stages = ", ".join(f"{k} {v:.2f}" for k, v in entry.items() if k not in ("ticker", "total_s"))
+            lines.append(f"  {entry['ticker']:<12}{entry['total_s']:>7.2f} s  ({stages})")
+        text.insert("1.0", "\n".join(lines))
+        text.config(state="disabled")
+
+    def refresh_results_df(self):
+        from dividend_engine import results_frame
+        self.results_df = results_frame(self.rows[t] for t in self.row_order())
+
+    def rederive(self, tickers):
+        """Rendite nur für die betroffenen Ticker neu berechnen – ohne Netzabruf."""
+        from dividend_engine import derive, find_override, raws_for_overrides
+        # Schlüssel können WKN/ISIN/Alias sein – Zuordnung wie beim Anwenden der Overrides
+        for raw in raws_for_overrides(self.raws.values(), tickers):
+            self.upsert_row(derive(raw, find_override(self.dividend_overrides, raw)))
+        self.refresh_results_df()
+        if self.rows and not self.screening:
+            save_snapshot(self.rows[t] for t in self.row_order())
+
+    def row_order(self):
+        items = {iid: ticker for ticker, iid in self.row_items.items()}
+        return [items[iid] for iid in self.tree.get_children()]
+
+    def _reset_tree(self):
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.rows.clear()
+        self.row_items.clear()
+        self.sort_keys.clear()
+
+    def clear_rows(self):
+        self._reset_tree()
+        self.raws.clear()
+        self.stale_tickers.clear()
+
+    def drop_rows(self, tickers):
+        for ticker in tickers:
+            iid = self.row_items.pop(ticker, None)
+            if iid is not None:
+                del self.sort_keys[self.tree.index(iid)]
+                self.tree.delete(iid)
+            self.rows.pop(ticker, None)
+
+    def row_sort_key(self, row):
+        """Schlüssel für die aktuelle Sortierung; fehlende Werte stehen immer am Ende."""
+        col, reverse = self.sort_spec
+        value = getattr(row, COLUMN_FIELDS[col])
+        if value is None:
+            return (1, 0)
+        if col in NUMERIC_COLUMNS:
+            return (0, -value if reverse else value)
+        value = str(value).lower()
+        return (0, _Descending(value) if reverse else value)
+
+    def upsert_row(self, row):
+        """Zeile einfügen oder ersetzen und per Bisektion an ihren Sortierplatz setzen."""
+        ticker = row.ticker
+        self.stale_tickers.discard(ticker)
+        iid = self.row_items.pop(ticker, None)
+        if iid is not None:
+            del self.sort_keys[self.tree.index(iid)]
+            self.tree.delete(iid)
+        key = self.row_sort_key(row)
+        pos = bisect.bisect_right(self.sort_keys, key)
+        self.sort_keys.insert(pos, key)
+        display = format_row(row)
+        tags = ("override",) if row.override else ()
+        self.row_items[ticker] = self.tree.insert("", pos, values=[display[col] for col in self.columns], tags=tags)
+        self.rows[ticker] = row
 
     def display_results(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        if self.results_df is not None and not self.results_df.empty:
-            df_sorted = self.results_df.copy()
-            df_sorted['numeric_yield'] = pd.to_numeric(df_sorted['Dividendenrendite (%)'], errors='coerce').fillna(0)
-            df_sorted = df_sorted.sort_values(by="numeric_yield", ascending=False)
-            for idx, row in df_sorted.iterrows():
-                ticker = row["Ticker"]
-                is_override = ticker in self.dividend_overrides
-                tags = ("override",) if is_override else ()
-                values = [row[col] for col in self.columns]
-                self.tree.insert("", "end", values=values, tags=tags)
-        # Dezente Markierung für Overrides
-        self.tree.tag_configure("override", background="#2A3B4D", foreground="#F9F9F9")
+        rows = list(self.rows.values())
+        self._reset_tree()
+        for row in rows:
+            self.upsert_row(row)
 
     def sort_by_column(self, col, reverse):
-        if self.results_df is None:
-            return
-        def get_sort_key(value_str):
-            try:
-                return float(''.join(c for c in value_str if c.isdigit() or c in '.,-').replace(',', '.'))
-            except:
-                return -1
-        l = sorted([(get_sort_key(self.tree.set(k, col)), k) for k in self.tree.get_children('')], key=lambda t: t[0], reverse=reverse)
-        for index, (_, k) in enumerate(l):
-            self.tree.move(k, '', index)
+        """Sortiert auf den Rohwerten der Zeilen (float-Spalten per argsort), ohne Zellentext zu lesen."""
+        self.sort_spec = (col, reverse)
         self.tree.heading(col, command=lambda _col=col: self.sort_by_column(_col, not reverse))
+        tickers = list(self.rows)
+        if not tickers:
+            return
+        field = COLUMN_FIELDS[col]
+        if col in NUMERIC_COLUMNS:
+            import numpy as np
+            values = np.array([getattr(self.rows[t], field) for t in tickers], dtype="float64")
+            # NaN (= unbekannt) sortiert argsort ans Ende, auch bei negierten Werten
+            order = np.argsort(-values if reverse else values, kind="stable").tolist()
+        else:
+            keys = [self.row_sort_key(self.rows[t]) for t in tickers]
+            order = sorted(range(len(tickers)), key=keys.__getitem__)
+        self.sort_keys = [self.row_sort_key(self.rows[tickers[i]]) for i in order]
+        self.tree.set_children("", *[self.row_items[tickers[i]] for i in order])
 
-    def export_to_csv(self):
-        if self.results_df is None or self.results_df.empty:
+    def export_results(self):
+        if not self.rows:
             messagebox.showinfo("Keine Daten", "Es gibt keine Daten zum Exportieren.")
             return
         now = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filepath = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV-Dateien", "*.csv")], initialfile=f"dividendenrendite_{now}.csv")
-        if filepath:
-            export_df = self.results_df.copy()
-            if 'numeric_yield' in export_df.columns:
-                export_df = export_df.drop(columns=['numeric_yield'])
-            export_df.to_csv(filepath, index=False, sep=';', decimal=',')
-            messagebox.showinfo("Export erfolgreich", f"Daten wurden in {filepath} gespeichert.")
+        kind = tk.StringVar(value=EXPORT_TYPES[0][0])
+        filepath = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=EXPORT_TYPES, typevariable=kind,
+                                                initialfile=f"dividendenrendite_{now}.csv")
+        if not filepath:
+            return
+        # Zeilen in Tabellenreihenfolge blockweise schreiben – ohne DataFrame-Kopie
+        from result_export import ExportError, export_rows
+        dialect = "en" if kind.get() == EXPORT_TYPES[1][0] else "de"
+        try:
+            count = export_rows((self.rows[t] for t in self.row_order()), filepath, dialect=dialect)
+        except (ExportError, OSError) as e:
+            messagebox.showerror("Export fehlgeschlagen", str(e))
+            return
+        messagebox.showinfo("Export erfolgreich", f"{count} Zeilen wurden in {filepath} gespeichert.")
 
 if __name__ == "__main__":
     app = DividendTrackerApp()
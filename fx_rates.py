@@ -0,0 +1,141 @@
+# ───────────────────────────────────────────────────────────────
+# Wechselkurs-Tabelle für beide Oberflächen
+# Ein Bulk-Download pro Lauf | Kreuzkurse über USD | TTL-Cache im Prozess
+# ───────────────────────────────────────────────────────────────
+import threading
+import time
+
+import pandas as pd
+import yfinance as yf
+
+from rate_limiter import YAHOO_LIMITER
+
+FX_TTL_SECONDS = 3600
+FX_PIVOT = "USD"
+
+# Werden bei einem Fehlgriff gleich mitgeladen, damit ein gestreamter Lauf
+# ohne vorherigen prefetch() mit einem einzigen Kursabruf auskommt
+COMMON_CURRENCIES = ("USD", "GBP", "CHF", "SEK", "NOK", "DKK", "CAD", "AUD", "JPY", "HKD", "PLN")
+
+# Yahoo notiert manche Börsen in Untereinheiten (Pence, Cent, Agorot)
+MINOR_UNITS = {
+    "GBp": ("GBP", 0.01),
+    "GBX": ("GBP", 0.01),
+    "ZAc": ("ZAR", 0.01),
+    "ILA": ("ILS", 0.01),
+}
+
+
+def major_currency(currency):
+    """Liefert (Hauptwährung, Faktor), z.B. "GBp" → ("GBP", 0.01)."""
+    return MINOR_UNITS.get(currency, (currency, 1.0))
+
+
+def _pair(src, dst):
+    return f"{src}{dst}=X"
+
+
+class FxTable:
+    """Prozessweite Kurstabelle; Einträge verfallen nach `ttl` Sekunden."""
+
+    def __init__(self, ttl=FX_TTL_SECONDS, pivot=FX_PIVOT):
+        self.ttl = ttl
+        self.pivot = pivot
+        self._rates = {}   # (src, dst) -> (Kurs, Zeitstempel)
+        self._failed = {}  # (src, dst) -> Zeitstempel des erfolglosen Abrufs
+        self._lock = threading.Lock()
+        # Nur ein Kursabruf zur Zeit; wer wartet, findet danach die Einträge vor
+        self._fetch_lock = threading.RLock()
+
+    def _get(self, src, dst):
+        with self._lock:
+            entry = self._rates.get((src, dst))
+        if entry and time.time() - entry[1] < self.ttl:
+            return entry[0]
+        return None
+
+    def _lookup(self, src, dst):
+        """Direkter Kurs, Kehrwert oder Kreuzkurs über die Pivot-Währung."""
+        rate = self._get(src, dst)
+        if rate is not None:
+            return rate
+        inverse = self._get(dst, src)
+        if inverse:
+            return 1.0 / inverse
+        if self.pivot not in (src, dst):
+            leg1 = self._lookup(src, self.pivot)
+            leg2 = self._lookup(self.pivot, dst)
+            if leg1 is not None and leg2 is not None:
+                return leg1 * leg2
+        return None
+
+    def _download(self, pairs):
+        """Lädt alle Paare mit einem einzigen yf.download und trägt sie ein."""
+        if not pairs:
+            return
+        YAHOO_LIMITER.acquire()
+        try:
+            data = yf.download(sorted(pairs), period="5d", interval="1d",
+                               group_by="column", auto_adjust=False,
+                               progress=False, threads=False)
+        except Exception as e:
+            print(f"Wechselkurs-Fehler {', '.join(sorted(pairs))}: {e}")
+            return
+        if data is None or data.empty:
+            return
+        close = data["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(next(iter(pairs)))
+        last = close.ffill().iloc[-1]
+        now = time.time()
+        with self._lock:
+            for pair, rate in last.items():
+                if pd.notna(rate) and rate > 0:
+                    self._rates[(pair[:3], pair[3:6])] = (float(rate), now)
+
+    def prefetch(self, currencies, dst="EUR"):
+        """Holt alle fehlenden Kurse für `currencies` in einem Abruf.
+
+        Neben dem direkten Paar wird jeweils auch das Pivot-Paar geladen, damit
+        ein fehlendes Direktpaar als Kreuzkurs abgeleitet werden kann.
+        """
+        needed = {major_currency(c)[0] for c in currencies if c}
+        if all(c == dst or self._lookup(c, dst) is not None for c in needed):
+            return
+        with self._fetch_lock:
+            needed = {c for c in needed if c != dst and self._lookup(c, dst) is None}
+            if not needed:
+                return
+            pairs = {_pair(c, dst) for c in needed}
+            pairs |= {_pair(c, self.pivot) for c in needed if c != self.pivot}
+            if dst != self.pivot:
+                pairs.add(_pair(self.pivot, dst))
+            self._download(pairs)
+
+    def rate(self, src, dst="EUR"):
+        """Kurs src→dst; lädt bei Bedarf nach, im Fehlerfall 1.0."""
+        src = major_currency(src)[0]
+        dst = major_currency(dst)[0]
+        if not src or src == dst:
+            return 1.0
+        rate = self._lookup(src, dst)
+        if rate is None:
+            with self._fetch_lock:
+                rate = self._lookup(src, dst)
+                failed = self._failed.get((src, dst))
+                if rate is None and not (failed and time.time() - failed < self.ttl):
+                    self.prefetch({src, *COMMON_CURRENCIES}, dst)
+                    rate = self._lookup(src, dst)
+                    if rate is None:
+                        self._failed[(src, dst)] = time.time()
+                        print(f"Wechselkurs-Fehler {src}->{dst}: kein Kurs verfügbar")
+        return 1.0 if rate is None else rate
+
+    def clear(self):
+        with self._lock:
+            self._rates.clear()
+            self._failed.clear()
+
+
+# Gemeinsame Tabelle für Tk-App und Streamlit-App
+FX = FxTable()
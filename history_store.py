@@ -0,0 +1,185 @@
+# ───────────────────────────────────────────────────────────────
+# Lokaler Kursverlauf je Ticker (Close + Dividenden als float32)
+# Eine .npy-Datei pro Ticker | nur neue Tage werden nachgeladen |
+# Lesen per Memory-Map, daher bleibt der Speicherbedarf begrenzt
+# ───────────────────────────────────────────────────────────────
+import contextlib
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from market_hours import settled_since
+from rate_limiter import YAHOO_LIMITER
+from single_flight import SingleFlight
+
+HISTORY_DIR = "history_cache"
+HISTORY_DAYS = 400        # Fenster, das die Apps lesen
+KEEP_DAYS = 5 * 366      # ältere Zeilen werden beim Schreiben verworfen (Renditeverlauf)
+REFRESH_SECONDS = 15 * 60 # so lange gilt eine Datei als aktuell (geschlossene Börse: bis zur Eröffnung)
+DOWNLOAD_BATCH = 200      # Ticker pro yf.download
+
+ROW = np.dtype([("day", "<i4"), ("close", "<f4"), ("div", "<f4")])
+
+# np.load liest den .npy-Kopf per ast.literal_eval. CPython < 3.13 führt die
+# Rekursionstiefe der AST-Umwandlung prozessweit (gh-106905): wechselt der
+# Thread mitten darin (z. B. in einem GC-Lauf) zu einem Thread auf anderer
+# Stacktiefe, wirft das SystemError ("AST constructor recursion depth
+# mismatch"). Nachgestellt in benchmarks/repro_npload.py; aufgetreten im
+# Lasttest gegen einen echten `streamlit run`-Server.
+_NPY_OPEN = threading.Lock() if sys.version_info < (3, 13) else contextlib.nullcontext()
+
+
+def _today():
+    return int(np.datetime64("today", "D").astype(np.int64))
+
+
+def _rows_from_frame(df):
+    """yfinance-Frame eines Tickers → strukturierte Zeilen (ohne leere Kurse)."""
+    if df is None or df.empty or "Close" not in df:
+        return np.empty(0, ROW)
+    df = df[df["Close"].notna()]
+    idx = pd.DatetimeIndex(df.index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    rows = np.empty(len(df), ROW)
+    rows["day"] = idx.normalize().values.astype("datetime64[D]").astype(np.int64)
+    rows["close"] = df["Close"].to_numpy(dtype="float32")
+    rows["div"] = df["Dividends"].fillna(0).to_numpy(dtype="float32") if "Dividends" in df else 0
+    return rows
+
+
+class HistoryStore:
+    def __init__(self, root=HISTORY_DIR, keep_days=KEEP_DAYS, refresh_seconds=REFRESH_SECONDS):
+        self.root = root
+        self.keep_days = keep_days
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()   # Ticker, die gerade eine andere Sitzung lädt
+        self._period = {}                # Ticker → größter bereits voll geladener Zeitraum (Tage)
+
+    def _path(self, ticker):
+        return os.path.join(self.root, ticker.replace(os.sep, "_") + ".npy")
+
+    def load(self, ticker):
+        """Gespeicherte Zeilen als Memory-Map (leer, wenn nichts vorhanden)."""
+        try:
+            with _NPY_OPEN:
+                rows = np.load(self._path(ticker), mmap_mode="r")
+        except (OSError, ValueError):
+            return np.empty(0, ROW)
+        return rows if rows.dtype == ROW else np.empty(0, ROW)
+
+    def _is_fresh(self, ticker):
+        try:
+            written = os.path.getmtime(self._path(ticker))
+        except OSError:
+            return False
+        now = time.time()
+        return now - written < self.refresh_seconds or settled_since(ticker, written, now)
+
+    def _covers(self, ticker, days):
+        """Reicht die Datei `days` Tage zurück (oder wurde so viel schon angefragt)?
+
+        Eine Woche Luft für Wochenenden und Feiertage am Fensteranfang; junge
+        Titel mit kürzerer Historie werden nur einmal je Prozess voll geladen.
+        """
+        if self._period.get(ticker, 0) >= days:
+            return True
+        rows = self.load(ticker)
+        return bool(len(rows)) and int(rows["day"][0]) <= _today() - days + 7
+
+    def _is_current(self, ticker, days):
+        return self._is_fresh(ticker) and self._covers(ticker, days)
+
+    def _append(self, ticker, new_rows):
+        """Überlappende Tage ersetzen, neue anhängen, alte abschneiden; atomar schreiben."""
+        old = np.array(self.load(ticker))
+        if len(new_rows):
+            old = old[old["day"] < new_rows["day"][0]]
+        rows = np.concatenate([old, new_rows])
+        rows = rows[rows["day"] >= _today() - self.keep_days]
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(ticker)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, rows)
+        os.replace(tmp, path)
+
+    def _download(self, tickers, **kwargs):
+        YAHOO_LIMITER.acquire()
+        bulk = yf.download(tickers, interval="1d", group_by="ticker",
+                           auto_adjust=False, actions=True,
+                           threads=False, progress=False, **kwargs)
+        if bulk is None or bulk.empty:
+            return {}
+        if not isinstance(bulk.columns, pd.MultiIndex):
+            return {tickers[0]: bulk}
+        present = set(bulk.columns.get_level_values(0))
+        return {t: bulk[t] for t in tickers if t in present}
+
+    def update(self, tickers, days=HISTORY_DAYS):
+        """Lädt je Ticker nur die Tage seit dem letzten gespeicherten Datum.
+
+        Ticker mit gleichem Startdatum teilen sich einen yf.download; der
+        letzte gespeicherte Tag wird erneut geholt, weil er beim letzten
+        Lauf noch ein laufender Handelstag gewesen sein kann. Ticker, die
+        gerade ein anderer Thread (andere Sitzung) lädt, werden nicht erneut
+        angefragt; auf sie wird am Ende gewartet. Reicht die gespeicherte
+        Historie nicht `days` Tage zurück, wird der ganze Zeitraum neu geladen.
+        """
+        stale = [t for t in dict.fromkeys(tickers) if not self._is_current(t, days)]
+        mine, others = self._flights.claim(stale)
+        try:
+            by_start = defaultdict(list)
+            for t in mine:
+                if self._is_current(t, days):   # inzwischen von einem anderen Abruf geschrieben
+                    continue
+                rows = self.load(t)
+                by_start[int(rows["day"][-1]) if self._covers(t, days) else None].append(t)
+
+            for start, group in by_start.items():
+                for i in range(0, len(group), DOWNLOAD_BATCH):
+                    batch = group[i:i + DOWNLOAD_BATCH]
+                    if start is None:
+                        kwargs = {"period": f"{days}d"}
+                    else:
+                        kwargs = {"start": str(np.datetime64(start, "D"))}
+                    try:
+                        frames = self._download(batch, **kwargs)
+                    except Exception as e:
+                        print(f"Historie-Fehler {', '.join(batch)}: {e}")
+                        continue
+                    with self._lock:
+                        for t in batch:
+                            self._append(t, _rows_from_frame(frames.get(t)))
+                            if start is None:
+                                self._period[t] = max(days, self._period.get(t, 0))
+        finally:
+            self._flights.release(mine)
+        self._flights.wait(others)
+
+    def frames(self, tickers, days=HISTORY_DAYS):
+        """(close_df, div_df) der letzten `days` Tage, Spalten = Ticker."""
+        first = _today() - days
+        close, divs = {}, {}
+        for t in dict.fromkeys(tickers):
+            rows = self.load(t)
+            rows = rows[rows["day"] >= first]
+            if not len(rows):
+                continue
+            idx = pd.DatetimeIndex(rows["day"].astype("datetime64[D]").astype("datetime64[ns]"))
+            close[t] = pd.Series(rows["close"], index=idx)
+            divs[t] = pd.Series(rows["div"], index=idx)
+        if not close:
+            return pd.DataFrame(), pd.DataFrame()
+        return pd.DataFrame(close), pd.DataFrame(divs)
+
+
+# Gemeinsamer Speicher für beide Oberflächen
+HISTORY = HistoryStore()
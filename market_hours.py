@@ -0,0 +1,92 @@
+# ───────────────────────────────────────────────────────────────
+# Handelszeiten je Börse (über das Yahoo-Suffix des Tickers)
+# Reguläre Sitzung Mo–Fr in Ortszeit; Feiertage werden nicht beachtet.
+# Unbekannte Börsen gelten als immer geöffnet (= es wird normal abgefragt).
+# ───────────────────────────────────────────────────────────────
+import datetime
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:   # Python < 3.9
+    ZoneInfo = None
+
+_t = datetime.time
+
+# Suffix → (Zeitzone, Eröffnung, Schluss); "US" = Ticker ohne Suffix
+MARKETS = {
+    "US":  ("America/New_York",  _t(9, 30), _t(16, 0)),
+    ".TO": ("America/Toronto",   _t(9, 30), _t(16, 0)),
+    ".DE": ("Europe/Berlin",     _t(9, 0),  _t(17, 30)),
+    ".F":  ("Europe/Berlin",     _t(8, 0),  _t(22, 0)),
+    ".L":  ("Europe/London",     _t(8, 0),  _t(16, 30)),
+    ".AS": ("Europe/Amsterdam",  _t(9, 0),  _t(17, 30)),
+    ".PA": ("Europe/Paris",      _t(9, 0),  _t(17, 30)),
+    ".BR": ("Europe/Brussels",   _t(9, 0),  _t(17, 30)),
+    ".MC": ("Europe/Madrid",     _t(9, 0),  _t(17, 30)),
+    ".MI": ("Europe/Rome",       _t(9, 0),  _t(17, 30)),
+    ".SW": ("Europe/Zurich",     _t(9, 0),  _t(17, 30)),
+    ".ST": ("Europe/Stockholm",  _t(9, 0),  _t(17, 30)),
+    ".CO": ("Europe/Copenhagen", _t(9, 0),  _t(17, 0)),
+    ".HE": ("Europe/Helsinki",   _t(10, 0), _t(18, 30)),
+    ".OL": ("Europe/Oslo",       _t(9, 0),  _t(16, 20)),
+}
+
+
+def market_of(ticker):
+    """Börsenschlüssel aus MARKETS oder None (Devisen, Indizes, Unbekanntes)."""
+    if not ticker or "=" in ticker or ticker.startswith("^"):
+        return None
+    dot = ticker.rfind(".")
+    key = ticker[dot:].upper() if dot > 0 else "US"
+    return key if key in MARKETS and ZoneInfo is not None else None
+
+def _local(market, now):
+    tz, opens, closes = MARKETS[market]
+    zone = ZoneInfo(tz)
+    return datetime.datetime.fromtimestamp(now, zone), zone, opens, closes
+
+def is_open(ticker, now=None):
+    market = market_of(ticker)
+    if market is None:
+        return True
+    local, _, opens, closes = _local(market, now if now is not None else datetime.datetime.now().timestamp())
+    return local.weekday() < 5 and opens <= local.time() < closes
+
+def last_close(ticker, now=None):
+    """Zeitstempel des letzten Sitzungsschlusses vor `now` (None bei unbekannter Börse)."""
+    market = market_of(ticker)
+    if market is None:
+        return None
+    now = now if now is not None else datetime.datetime.now().timestamp()
+    local, zone, _, closes = _local(market, now)
+    day = local.date()
+    for _ in range(8):
+        if day.weekday() < 5:
+            stamp = datetime.datetime.combine(day, closes, zone).timestamp()
+            if stamp <= now:
+                return stamp
+        day -= datetime.timedelta(days=1)
+    return None
+
+def next_open(ticker, now=None):
+    """Zeitstempel der nächsten Eröffnung nach `now` (None bei unbekannter Börse)."""
+    market = market_of(ticker)
+    if market is None:
+        return None
+    now = now if now is not None else datetime.datetime.now().timestamp()
+    local, zone, opens, _ = _local(market, now)
+    day = local.date()
+    for _ in range(8):
+        if day.weekday() < 5:
+            stamp = datetime.datetime.combine(day, opens, zone).timestamp()
+            if stamp > now:
+                return stamp
+        day += datetime.timedelta(days=1)
+    return None
+
+def settled_since(ticker, fetched, now=None):
+    """True, wenn die Börse seit `fetched` nicht gehandelt hat – Kurse sind dann noch aktuell."""
+    if is_open(ticker, now):
+        return False
+    closed = last_close(ticker, now)
+    return closed is not None and fetched >= closed
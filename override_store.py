@@ -0,0 +1,220 @@
+# ───────────────────────────────────────────────────────────────
+# Manuelle Dividenden (Overrides) – absturz- und mehrfachschreibsicher
+# Schreiben: Dateisperre → neu einlesen → ändern → temporäre Datei →
+# os.replace; so gehen Änderungen paralleler Streamlit-Sitzungen und der
+# Tk-App nicht verloren und die Datei ist nie halb geschrieben.
+# Lesen: Cache im Speicher, neu eingelesen nur bei geänderter mtime/Größe.
+#
+# Datei: {"version": 2, "values": {Ticker: €}, "history": {Ticker: [[Zeit, €|null], …]}}
+# (alte Dateien im Format {Ticker: €} werden weiter gelesen)
+# ───────────────────────────────────────────────────────────────
+import contextlib
+import datetime
+import json
+import os
+import threading
+from collections.abc import Mapping
+
+import symbol_index
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+OVERRIDE_FILE = "dividend_overrides.json"
+HISTORY_LIMIT = 50   # gespeicherte Änderungen je Ticker
+
+
+
+class OverrideValues(Mapping):
+    """Schreibgeschützte Overrides eines Dateistands (Schlüssel wie gespeichert → €).
+
+    by_ticker ordnet zusätzlich jedem über den Symbolindex aufgelösten
+    Schlüssel (WKN, ISIN, Alias) seinen Wert zu. Aufgelöst wird einmal je
+    Dateistand, beim ersten Zugriff; direkt gespeicherte Ticker gewinnen.
+    """
+
+    def __init__(self, values=(), resolve=None):
+        self._values = dict(values)
+        self._resolve = resolve
+        self._by_ticker = None
+
+    def __getitem__(self, ticker):
+        return self._values[ticker]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f"OverrideValues({self._values!r})"
+
+    @property
+    def by_ticker(self):
+        if self._by_ticker is None:
+            resolve = self._resolve or symbol_index.SYMBOLS.resolve
+            by_ticker = {}
+            for key, value in self._values.items():
+                by_ticker.setdefault(resolve(key), value)
+            by_ticker.pop(None, None)
+            by_ticker.update(self._values)
+            self._by_ticker = by_ticker
+        return self._by_ticker
+
+
+_EMPTY = OverrideValues()
+
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """Exklusive Sperre über eine Begleitdatei (prozessübergreifend)."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:   # LK_LOCK gibt nach ~10 s auf – weiter warten
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class OverrideStore:
+    """Overrides einer JSON-Datei; values() ist ein schreibgeschütztes Dict (O(1)-Zugriff)."""
+
+    def __init__(self, path=OVERRIDE_FILE, history_limit=HISTORY_LIMIT, resolve=None):
+        self.path = path
+        self.history_limit = history_limit
+        self.resolve = resolve    # Schlüssel → Ticker; Standard: Symbolindex
+        self._lock = threading.Lock()
+        self._stamp = None        # (mtime_ns, Größe) der zuletzt gelesenen Datei
+        self._values = _EMPTY
+        self._history = {}
+
+    # ───────── Lesen ─────────
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _parse(self):
+        """(Werte, Historie) aus der Datei; ValueError bei kaputtem Inhalt."""
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("kein JSON-Objekt")
+        if "values" not in data:   # altes Format {Ticker: Wert}
+            data = {"values": data, "history": {}}
+        values = {str(t): float(v) for t, v in data["values"].items() if v is not None}
+        history = {str(t): [tuple(e) for e in h] for t, h in (data.get("history") or {}).items()}
+        return values, history
+
+    def _refresh(self):
+        """Cache neu laden, falls sich die Datei geändert hat (Aufruf unter self._lock)."""
+        stamp = self._stat()
+        if stamp == self._stamp:
+            return
+        if stamp is None:
+            self._values, self._history = _EMPTY, {}
+        else:
+            try:
+                values, self._history = self._parse()
+                self._values = OverrideValues(values, self.resolve)
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                # letzten gültigen Stand behalten statt still {} zu liefern
+                print(f"Overrides nicht lesbar ({self.path}): {e}")
+        self._stamp = stamp
+
+    def values(self):
+        """Aktuelle Overrides (Ticker → €); bei unveränderter Datei ohne Neueinlesen."""
+        with self._lock:
+            self._refresh()
+            return self._values
+
+    def get(self, ticker, default=None):
+        return self.values().get(ticker, default)
+
+    def __contains__(self, ticker):
+        return ticker in self.values()
+
+    def __len__(self):
+        return len(self.values())
+
+    def history(self, ticker):
+        """Änderungen eines Tickers als [(Zeitpunkt, Wert|None), …], älteste zuerst."""
+        with self._lock:
+            self._refresh()
+            return list(self._history.get(ticker, ()))
+
+    # ───────── Schreiben ─────────
+    def update(self, changes):
+        """Mehrere Overrides setzen ({Ticker: € oder None = löschen}); liefert die neuen Werte."""
+        with self._lock, _file_lock(f"{self.path}.lock"):
+            # unter der Sperre frisch lesen, damit fremde Änderungen erhalten bleiben
+            values, history = self._load_for_write()
+            now = datetime.datetime.now().isoformat(timespec="seconds")
+            for ticker, value in changes.items():
+                value = None if value is None else float(value)
+                if values.get(ticker) == value:
+                    continue
+                if value is None:
+                    if ticker not in values:
+                        continue
+                    del values[ticker]
+                else:
+                    values[ticker] = value
+                history.setdefault(ticker, []).append((now, value))
+                del history[ticker][:-self.history_limit]
+            self._write(values, history)
+            self._values, self._history = OverrideValues(values, self.resolve), history
+            self._stamp = self._stat()
+            return self._values
+
+    def set(self, ticker, value):
+        return self.update({ticker: value})
+
+    def clear(self):
+        """Alle Overrides löschen (die Historie bleibt erhalten)."""
+        return self.update(dict.fromkeys(self.values()))
+
+    def _load_for_write(self):
+        if self._stat() is None:
+            return {}, {}
+        try:
+            return self._parse()
+        except (OSError, ValueError, TypeError, AttributeError):
+            # nicht lesbare Datei beiseitelegen, mit dem letzten gültigen Stand weiter
+            backup = f"{self.path}.corrupt"
+            os.replace(self.path, backup)
+            print(f"Nicht lesbare Overrides gesichert als {backup}")
+            return dict(self._values), {t: list(h) for t, h in self._history.items()}
+
+    def _write(self, values, history):
+        data = {"version": 2, "values": values,
+                "history": {t: [list(e) for e in h] for t, h in history.items()}}
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+# Gemeinsamer Store für Tk-App, Streamlit-Sitzungen und Kommandozeile
+OVERRIDES = OverrideStore()
@@ -0,0 +1,178 @@
+# ───────────────────────────────────────────────────────────────
+# Laufzeit-Messung der Analyse
+# Stufenzeiten je Ticker | Upstream-Aufrufe | Cache-Treffer |
+# Wiederholungen und Wartezeit | JSON-Log (eine Zeile je Lauf)
+# ───────────────────────────────────────────────────────────────
+import datetime
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+
+from rate_limiter import YAHOO_LIMITER
+
+PERF_LOG = "perf_log.jsonl"
+
+
+class RunStats:
+    """Messwerte eines Analyse-Laufs; von allen Worker-Threads gemeinsam befüllt.
+
+    Die Gesamtzahl der Upstream-Aufrufe und die Drosselzeit stammen aus dem
+    prozessweiten Limiter und enthalten daher auch gleichzeitige Läufe anderer
+    Sitzungen.
+    """
+
+    def __init__(self, label="analyse", limiter=YAHOO_LIMITER):
+        self.label = label
+        self.started = datetime.datetime.now().isoformat(timespec="seconds")
+        self.wall = None
+        self.per_ticker = defaultdict(dict)   # Ticker → {Stufe: Sekunden}
+        self.stages = defaultdict(lambda: [0.0, 0, 0.0])   # Stufe → [Summe, Anzahl, Maximum]
+        self.calls = Counter()                # Art → Upstream-Aufrufe
+        self.cache = defaultdict(Counter)     # Gruppe → {"hit": n, "miss": n}
+        self.retries = 0
+        self.retry_sleep = 0.0
+        self.skipped = Counter()              # Art → wegen offenem Breaker ausgelassen
+        self._limiter = limiter
+        self._limiter_start = (limiter.acquired, limiter.waited)
+        self._limiter_delta = (0, 0.0)
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+
+    # ── Erfassen ──
+    def add_time(self, stage, seconds, ticker=None):
+        with self._lock:
+            total = self.stages[stage]
+            total[0] += seconds
+            total[1] += 1
+            total[2] = max(total[2], seconds)
+            if ticker is not None:
+                times = self.per_ticker[ticker]
+                times[stage] = times.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, stage, ticker=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start, ticker)
+
+    def call(self, kind, n=1):
+        with self._lock:
+            self.calls[kind] += n
+
+    def cache_lookup(self, group, hit):
+        with self._lock:
+            self.cache[group]["hit" if hit else "miss"] += 1
+
+    def retry(self, slept):
+        with self._lock:
+            self.retries += 1
+            self.retry_sleep += slept
+
+    def skip(self, kind):
+        with self._lock:
+            self.skipped[kind] += 1
+
+    def finish(self):
+        if self.wall is None:
+            self.wall = time.perf_counter() - self._t0
+            self._limiter_delta = (self._limiter.acquired - self._limiter_start[0],
+                                   self._limiter.waited - self._limiter_start[1])
+        return self
+
+    # ── Auswerten ──
+    def summary(self):
+        """Kennzahlen des Laufs als JSON-taugliches Dict."""
+        wall = self.wall if self.wall is not None else time.perf_counter() - self._t0
+        with self._lock:
+            calls = dict(self.calls)
+            # Rest = Bulk-Downloads (Historie, Wechselkurse) über denselben Limiter
+            bulk = self._limiter_delta[0] - sum(calls.values())
+            if bulk > 0:
+                calls["bulk"] = bulk
+            calls["total"] = self._limiter_delta[0]
+            return {
+                "run": self.label,
+                "started": self.started,
+                "wall_s": round(wall, 3),
+                "tickers": len(self.per_ticker),
+                "stages": {name: {"total_s": round(t, 3), "count": n, "max_s": round(m, 3)}
+                           for name, (t, n, m) in self.stages.items()},
+                "calls": calls,
+                "cache": {grp: {"hits": c["hit"], "misses": c["miss"],
+                                "hit_rate": round(c["hit"] / (c["hit"] + c["miss"]), 3)}
+                          for grp, c in self.cache.items() if c["hit"] + c["miss"]},
+                "retries": self.retries,
+                "retry_sleep_s": round(self.retry_sleep, 3),
+                "skipped": dict(self.skipped),
+                "throttle_s": round(self._limiter_delta[1], 3),
+            }
+
+    def slowest(self, n=10):
+        """Die `n` Ticker mit der größten Summe über alle Stufen."""
+        with self._lock:
+            items = [(t, dict(s)) for t, s in self.per_ticker.items()]
+        items.sort(key=lambda item: sum(item[1].values()), reverse=True)
+        return [{"ticker": t, "total_s": round(sum(s.values()), 3),
+                 **{k: round(v, 3) for k, v in s.items()}} for t, s in items[:n]]
+
+    def record(self):
+        """Summary plus Zeiten je Ticker – ein Eintrag im JSON-Log."""
+        out = self.summary()
+        with self._lock:
+            out["per_ticker"] = {t: {k: round(v, 4) for k, v in s.items()}
+                                 for t, s in self.per_ticker.items()}
+        return out
+
+    def write_log(self, path=PERF_LOG):
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.record(), ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Performance-Log nicht geschrieben: {e}")
+
+
+class _NoStats:
+    """Ersatz, wenn nicht gemessen wird: alle Aufrufe sind wirkungslos."""
+
+    def add_time(self, stage, seconds, ticker=None):
+        pass
+
+    def stage(self, stage, ticker=None):
+        return nullcontext()
+
+    def call(self, kind, n=1):
+        pass
+
+    def cache_lookup(self, group, hit):
+        pass
+
+    def retry(self, slept):
+        pass
+
+    def skip(self, kind):
+        pass
+
+
+NO_STATS = _NoStats()
+
+
+def format_summary(summary):
+    """Mehrzeiliger Text für Statusanzeigen."""
+    lines = [f"Lauf {summary['started']}: {summary['tickers']} Ticker in {summary['wall_s']:.2f} s"]
+    calls = summary["calls"]
+    kinds = ", ".join(f"{k} {v}" for k, v in sorted(calls.items()) if k != "total")
+    lines.append(f"Upstream-Aufrufe: {calls.get('total', 0)}" + (f" ({kinds})" if kinds else ""))
+    for grp, c in sorted(summary["cache"].items()):
+        lines.append(f"Cache {grp}: {c['hit_rate']:.0%} Treffer ({c['hits']}/{c['hits'] + c['misses']})")
+    lines.append(f"Wiederholungen: {summary['retries']} ({summary['retry_sleep_s']:.2f} s Pause), "
+                 f"Drosselung: {summary['throttle_s']:.2f} s")
+    if summary["skipped"]:
+        lines.append("Breaker offen, ausgelassen: "
+                     + ", ".join(f"{k} {v}" for k, v in sorted(summary["skipped"].items())))
+    for name, s in sorted(summary["stages"].items(), key=lambda kv: -kv[1]["total_s"]):
+        lines.append(f"  {name:<18}{s['total_s']:>9.2f} s  ×{s['count']:<6} max {s['max_s']:.2f} s")
+    return "\n".join(lines)
@@ -0,0 +1,152 @@
+# ───────────────────────────────────────────────────────────────
+# Hintergrund-Aktualisierung der Standard-Ticker (config.txt)
+# Hält Info-Cache und Kurshistorie warm, damit „Analyse starten“ sofort
+# Ergebnisse liefert. Geöffnete Börsen werden regelmäßig abgefragt,
+# geschlossene nur einmal nach Sitzungsschluss.
+# In den Apps nur auf Wunsch aktiv: Umgebungsvariable DIVIDENDEN_PREFETCH=1.
+#
+#   python prefetch_scheduler.py             # eigener Prozess (z.B. neben Streamlit)
+#   python prefetch_scheduler.py --once
+#   DIVIDENDEN_PREFETCH=1 streamlit run Streamlit-App.py
+# ───────────────────────────────────────────────────────────────
+import argparse
+import os
+import threading
+import time
+
+from market_hours import is_open, last_close
+from symbol_index import SYMBOLS
+
+CONFIG_FILE = "config.txt"
+PREFETCH_ENV = "DIVIDENDEN_PREFETCH"
+
+OPEN_INTERVAL = 10 * 60   # Abstand bei geöffneter Börse (unter der Kurs-TTL von 15 min)
+CHECK_SECONDS = 60        # so oft prüft der Thread, was fällig ist
+PREFETCH_WORKERS = 2      # bewusst wenige, damit Klicks der Nutzer Vorrang haben
+
+
+def prefetch_enabled():
+    """Hintergrund-Aktualisierung in den Apps eingeschaltet (DIVIDENDEN_PREFETCH=1)?"""
+    return os.environ.get(PREFETCH_ENV, "").strip().lower() in ("1", "true", "yes", "ja", "on")
+
+def config_tickers(path=CONFIG_FILE):
+    """Yahoo-Ticker aus config.txt; WKN/ISIN über den Symbolindex, Unbekanntes entfällt."""
+    from dividend_engine import iter_tickers   # erst hier: schwere Importe (pandas, yfinance)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            symbols = [SYMBOLS.resolve(t) for t in iter_tickers(f)]
+    except OSError:
+        return []
+    return list(dict.fromkeys(s for s in symbols if s))
+
+
+class PrefetchScheduler:
+    """Daemon-Thread, der fällige Ticker gebündelt über die Engine lädt.
+
+    Statt einer festen Liste kann `source()` die Ticker liefern; sie wird bei
+    jeder Prüfung neu abgefragt, so dass Änderungen an config.txt ohne
+    zweiten Scheduler übernommen werden.
+    """
+
+    def __init__(self, tickers=(), interval=OPEN_INTERVAL, check=CHECK_SECONDS,
+                 workers=PREFETCH_WORKERS, refresh=None, source=None):
+        self.tickers = list(dict.fromkeys(tickers))
+        self.source = source
+        self.interval = interval
+        self.check = check
+        self.workers = workers
+        self.refresh = refresh or self._analyze
+        self.last = {}            # Ticker → Zeitstempel der letzten Aktualisierung
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _analyze(self, batch):
+        from dividend_engine import analyze_portfolio
+        analyze_portfolio(batch, workers=self.workers)
+
+    def due(self, now=None):
+        """Ticker, die jetzt aktualisiert werden sollten."""
+        now = now if now is not None else time.time()
+        out = []
+        for t in self.tickers:
+            last = self.last.get(t)
+            if last is None:
+                out.append(t)
+            elif is_open(t, now):
+                if now - last >= self.interval:
+                    out.append(t)
+            else:
+                closed = last_close(t, now)
+                if closed is not None and last < closed:   # Schlusskurs noch nicht geholt
+                    out.append(t)
+        return out
+
+    def reload(self):
+        """Tickerliste aus `source()` übernehmen (falls angegeben)."""
+        if self.source is None:
+            return
+        try:
+            tickers = list(dict.fromkeys(self.source()))
+        except Exception as e:
+            print(f"Tickerliste nicht lesbar: {e}")
+            return
+        if tickers != self.tickers:
+            self.tickers = tickers
+            self.last = {t: self.last[t] for t in tickers if t in self.last}
+
+    def run_once(self, now=None):
+        self.reload()
+        batch = self.due(now)
+        if not batch:
+            return []
+        try:
+            self.refresh(batch)
+        except Exception as e:
+            print(f"Hintergrund-Aktualisierung fehlgeschlagen: {e}")
+            return []
+        stamp = time.time()
+        for t in batch:
+            self.last[t] = stamp
+        return batch
+
+    def _loop(self):
+        while True:
+            self.run_once()
+            if self._stop.wait(self.check):
+                return
+
+    def start(self):
+        if self._thread is None and (self.tickers or self.source is not None):
+            self._thread = threading.Thread(target=self._loop, name="prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Standard-Ticker im Hintergrund aktuell halten.")
+    parser.add_argument("tickers", nargs="*", help="Ticker; ohne Angabe aus config.txt")
+    parser.add_argument("--once", action="store_true", help="nur einmal aktualisieren")
+    parser.add_argument("--interval", type=int, default=OPEN_INTERVAL, help="Sekunden bei geöffneter Börse")
+    args = parser.parse_args(argv)
+
+    from dividend_engine import iter_tickers
+    tickers = list(iter_tickers(args.tickers)) or config_tickers()
+    scheduler = PrefetchScheduler(tickers, interval=args.interval)
+    if args.once:
+        print(f"Aktualisiert: {', '.join(scheduler.run_once()) or '–'}")
+        return
+    print(f"Hintergrund-Aktualisierung für {len(tickers)} Ticker (Strg+C beendet)")
+    try:
+        while True:
+            batch = scheduler.run_once()
+            if batch:
+                print(f"{time.strftime('%H:%M:%S')} aktualisiert: {len(batch)} Ticker")
+            time.sleep(scheduler.check)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# ───────────────────────────────────────────────────────────────
+# Globaler Rate-Limiter für Yahoo-Anfragen (Token-Bucket)
+# Wird von allen Worker-Threads gemeinsam genutzt, damit parallele
+# Abrufe Yahoo nicht schneller anfragen als erlaubt.
+# ───────────────────────────────────────────────────────────────
+import itertools
+import random
+import threading
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """Token-Bucket: im Mittel `rate` Anfragen pro Sekunde, Bursts bis `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+        # Zähler für die Laufzeit-Messung (perf_stats)
+        self.acquired = 0
+        self.waited = 0.0
+
+    def acquire(self, tokens=1):
+        """Blockiert, bis `tokens` verfügbar sind, und verbraucht sie."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.acquired += 1
+                    return
+                wait = (tokens - self._tokens) / self.rate
+                self.waited += wait
+            time.sleep(wait)
+
+
+class BreakerOpen(Exception):
+    """Aufruf unterdrückt, weil der Circuit-Breaker offen ist."""
+
+
+class CircuitBreaker:
+    """Sperrt Aufrufe für `cooldown` Sekunden, wenn die Fehlerquote zu hoch ist.
+
+    Bewertet werden die letzten `window` Ergebnisse (ab `min_calls`). Nach
+    der Sperre darf genau ein Probe-Aufruf durch: Erfolg schließt den
+    Breaker wieder, ein Fehler startet die nächste Sperre. Ergebnisse
+    anderer, noch vor der Sperre gestarteter Aufrufe zählen dabei nicht.
+    """
+
+    def __init__(self, threshold=0.5, window=20, min_calls=8, cooldown=30.0):
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self._results = deque(maxlen=window)
+        self._opened = None    # monotone Zeit der Öffnung, None = geschlossen
+        self._probe = None     # Token des laufenden Probe-Aufrufs
+        self._tokens = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened is not None
+
+    def allow(self):
+        """Token für einen erlaubten Aufruf, sonst None.
+
+        Das Token geht nach dem Aufruf an record(ok, token) zurück.
+        """
+        with self._lock:
+            token = next(self._tokens)
+            if self._opened is None:
+                return token
+            if self._probe is None and time.monotonic() - self._opened >= self.cooldown:
+                self._probe = token
+                return token
+            return None
+
+    def record(self, ok, token=None):
+        with self._lock:
+            if self._opened is not None:
+                # halboffen entscheidet nur der Probe-Aufruf
+                if token is not None and token == self._probe:
+                    self._probe = None
+                    self._opened = None if ok else time.monotonic()
+                return
+            self._results.append(bool(ok))
+            failures = self._results.count(False)
+            if len(self._results) >= self.min_calls and failures / len(self._results) >= self.threshold:
+                self._opened = time.monotonic()
+                self._results.clear()
+
+    def reset(self):
+        with self._lock:
+            self._results.clear()
+            self._opened = None
+            self._probe = None
+
+
+def backoff_delay(attempt, base=0.25, cap=4.0, rng=random):
+    """Exponentielles Backoff mit vollem Jitter: gleichverteilt in [0, min(cap, base·2^attempt)]."""
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+# Gemeinsamer Limiter für alle Yahoo-Aufrufe (info, history, Wechselkurse)
+YAHOO_RATE_PER_SEC = 4
+YAHOO_BURST = 8
+YAHOO_LIMITER = TokenBucket(YAHOO_RATE_PER_SEC, YAHOO_BURST)
+# Gemeinsamer Breaker für Einzelabrufe (info, Kurs, Dividendenhistorie)
+YAHOO_BREAKER = CircuitBreaker()
@@ -0,0 +1,295 @@
+# ───────────────────────────────────────────────────────────────
+# Export der Ergebniszeilen: CSV, Parquet, XLSX – blockweise geschrieben
+# Zeilen werden gepuffert und je CHUNK_ROWS an die Datei angehängt; es
+# entsteht nie ein DataFrame des ganzen Ergebnisses. Dateien erscheinen
+# erst beim Schließen (temporäre Datei + os.replace).
+#
+# Renditeverlauf: jeder Lauf optional als eigene Datei in einem nach
+# Datum partitionierten Verzeichnis (yield_history/date=2024-05-17/…),
+# lesbar z.B. mit pandas.read_parquet("yield_history").
+#
+# Parquet braucht pyarrow, XLSX openpyxl (siehe requirements.txt); fehlt
+# eines, meldet der Export das Format mit ExportError als nicht verfügbar.
+# ───────────────────────────────────────────────────────────────
+import csv
+import datetime
+import glob
+import io
+import os
+import uuid
+
+from result_rows import COLUMN_FIELDS, NUMERIC_COLUMNS, ROW_FIELDS
+
+CHUNK_ROWS = 1000
+SNAPSHOT_DIR = "yield_history"
+
+# Exportspalten der Oberflächen (wie bisher: Anzeige-Spalten plus Status-Flags)
+EXPORT_COLUMNS = (*COLUMN_FIELDS, "Override", "Fehler")
+# Spalten des Renditeverlaufs: Zeitpunkt des Laufs plus alle Rohfelder
+DATASET_COLUMNS = ("run", *ROW_FIELDS)
+_FLOAT_COLUMNS = {*NUMERIC_COLUMNS, "price_eur", "dividend_eur", "yield_pct"}
+_BOOL_COLUMNS = {"Override", "Fehler", "override"}
+
+# CSV-Varianten: deutsch (Excel-kompatibel) und international
+CSV_DIALECTS = {
+    "de": (";", ","),
+    "en": (",", "."),
+}
+FORMATS = {".csv": "csv", ".parquet": "parquet", ".xlsx": "xlsx"}
+
+
+class ExportError(Exception):
+    """Export nicht möglich (z.B. fehlendes optionales Paket)."""
+
+
+def export_values(row):
+    return [getattr(row, field) for field in COLUMN_FIELDS.values()] + [bool(row.override), row.has_error]
+
+def _dataset_values(run):
+    return lambda row: [run] + [getattr(row, field) for field in ROW_FIELDS]
+
+
+# ───────── Writer ─────────────────────────────────────────────
+class _Export:
+    """Gemeinsamer Ablauf: puffern → Block schreiben → beim Schließen ersetzen."""
+
+    def __init__(self, target, columns=EXPORT_COLUMNS, values=export_values, chunk=CHUNK_ROWS):
+        self.columns = tuple(columns)
+        self.values = values
+        self.chunk = chunk
+        self.rows = 0
+        self._buffer = []
+        # Pfad → versteckte temporäre Datei daneben (Dataset-Leser ignorieren ".…");
+        # Dateiobjekt (z.B. BytesIO) → direkt
+        self.path = os.fspath(target) if isinstance(target, (str, os.PathLike)) else None
+        if self.path:
+            folder, name = os.path.split(self.path)
+            self._tmp = os.path.join(folder, f".{name}.tmp")
+        self._out = open(self._tmp, "wb") if self.path else target
+        try:
+            self._begin()
+        except BaseException:
+            self.discard()
+            raise
+
+    def add(self, row):
+        self._buffer.append(self.values(row))
+        if len(self._buffer) >= self.chunk:
+            self.flush()
+
+    def add_all(self, rows):
+        for row in rows:
+            self.add(row)
+        return self
+
+    def flush(self):
+        if self._buffer:
+            self._write(self._buffer)
+            self.rows += len(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._end()
+        if self.path:
+            self._out.close()
+            os.replace(self._tmp, self.path)
+
+    def discard(self):
+        """Abbrechen: bei Pfad-Zielen bleibt keine (Teil-)Datei zurück."""
+        # Format-Writer zuerst schließen – sonst schreibt sein __del__ in die geschlossene Datei
+        try:
+            self._abort()
+        except Exception:
+            pass
+        if self.path:
+            self._out.close()
+            try:
+                os.remove(self._tmp)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def _begin(self):
+        pass
+
+    def _end(self):
+        pass
+
+    def _abort(self):
+        pass
+
+
+class CsvExport(_Export):
+    def __init__(self, target, dialect="de", **kwargs):
+        self.sep, self.decimal = CSV_DIALECTS[dialect]
+        super().__init__(target, **kwargs)
+
+    def _begin(self):
+        self._text = io.TextIOWrapper(self._out, encoding="utf-8-sig", newline="", write_through=True)
+        self._csv = csv.writer(self._text, delimiter=self.sep)
+        self._csv.writerow(self.columns)
+        self._float = [c in _FLOAT_COLUMNS for c in self.columns]
+
+    def _cell(self, value, is_float):
+        if value is None:
+            return ""
+        if is_float:
+            return repr(float(value)).replace(".", self.decimal)
+        return value
+
+    def _write(self, rows):
+        self._csv.writerows([self._cell(v, f) for v, f in zip(values, self._float)] for values in rows)
+
+    def _end(self):
+        self._text.flush()
+        self._text.detach()   # Zieldatei nicht mit dem Wrapper schließen
+
+    def _abort(self):
+        if getattr(self, "_text", None) is not None:
+            self._text.detach()
+
+
+class ParquetExport(_Export):
+    """Je Block eine Row-Group; Schema fest aus den Spalten."""
+
+    def _begin(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportError("Parquet-Export benötigt pyarrow (pip install pyarrow).") from None
+        self._pa = pa
+        self._schema = pa.schema([
+            (c, pa.float64() if c in _FLOAT_COLUMNS else pa.bool_() if c in _BOOL_COLUMNS else pa.string())
+            for c in self.columns])
+        self._writer = pq.ParquetWriter(self._out, self._schema, compression="zstd")
+
+    def _write(self, rows):
+        columns = list(zip(*rows))
+        self._writer.write_table(self._pa.table(
+            [self._pa.array(col, type=field.type) for col, field in zip(columns, self._schema)],
+            schema=self._schema))
+
+    def _end(self):
+        self._writer.close()
+
+    def _abort(self):
+        if getattr(self, "_writer", None) is not None:
+            self._writer.close()
+
+
+class XlsxExport(_Export):
+    """openpyxl im write-only-Modus: Zeilen werden gestreamt, nicht als Zellen gehalten."""
+
+    def _begin(self):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ExportError("XLSX-Export benötigt openpyxl (pip install openpyxl).") from None
+        self._book = Workbook(write_only=True)
+        self._sheet = self._book.create_sheet("Dividendenrendite")
+        self._sheet.append(list(self.columns))
+
+    def _write(self, rows):
+        for values in rows:
+            self._sheet.append(values)
+
+    def _end(self):
+        self._book.save(self._out)
+
+    def _abort(self):
+        if getattr(self, "_book", None) is not None:
+            self._book.close()
+
+
+_WRITERS = {"csv": CsvExport, "parquet": ParquetExport, "xlsx": XlsxExport}
+
+
+def open_export(target, fmt=None, dialect="de", **kwargs):
+    """Writer für `target` (Pfad oder binäres Dateiobjekt); Format sonst aus der Endung."""
+    if fmt is None:
+        fmt = FORMATS.get(os.path.splitext(str(target))[1].lower(), "csv")
+    if fmt == "csv":
+        return CsvExport(target, dialect=dialect, **kwargs)
+    return _WRITERS[fmt](target, **kwargs)
+
+def export_rows(rows, target, fmt=None, dialect="de"):
+    """Zeilen blockweise exportieren; liefert die Anzahl geschriebener Zeilen."""
+    with open_export(target, fmt, dialect) as out:
+        out.add_all(rows)
+    return out.rows
+
+
+# ───────── Renditeverlauf (partitioniertes Dataset) ───────────
+def dataset_format():
+    try:
+        import pyarrow  # noqa: F401
+        return "parquet"
+    except ImportError:
+        return "csv"
+
+def snapshot_export(root=SNAPSHOT_DIR, when=None, fmt=None):
+    """Writer für einen Lauf: <root>/date=JJJJ-MM-TT/run-HHMMSS-<zufall>.<fmt>.
+
+    Ohne pyarrow wird CSV (international) geschrieben.
+    """
+    when = when or datetime.datetime.now()
+    fmt = fmt or dataset_format()
+    folder = os.path.join(root, f"date={when:%Y-%m-%d}")
+    os.makedirs(folder, exist_ok=True)
+    # Zufallsteil: parallele Läufe (mehrere Sitzungen) überschreiben sich nicht
+    path = os.path.join(folder, f"run-{when:%H%M%S}-{uuid.uuid4().hex[:8]}.{fmt}")
+    run = when.isoformat(timespec="seconds")
+    return open_export(path, fmt, dialect="en", columns=DATASET_COLUMNS, values=_dataset_values(run))
+
+def append_snapshot(rows, root=SNAPSHOT_DIR, when=None):
+    """Einen fertigen Lauf an den Renditeverlauf anhängen; liefert die Anzahl Zeilen."""
+    with snapshot_export(root, when) as out:
+        out.add_all(rows)
+    return out.rows
+
+def snapshot_files(root=SNAPSHOT_DIR, since=None):
+    """Dateien des Renditeverlaufs (optional ab Datum `since`), chronologisch."""
+    files = []
+    for folder in sorted(glob.glob(os.path.join(root, "date=*"))):
+        day = os.path.basename(folder)[5:]
+        if since is None or day >= str(since):
+            files.extend(sorted(glob.glob(os.path.join(folder, "run-*.*"))))
+    return files
+
+def load_snapshots(root=SNAPSHOT_DIR, tickers=None, since=None, columns=None):
+    """Renditeverlauf als DataFrame (pandas); Datei für Datei, gefiltert nach Tickern.
+
+    `since` (Datum) begrenzt die gelesenen Partitionen, `columns` die Spalten
+    (run und ticker werden immer gelesen).
+    """
+    import pandas as pd
+    if columns is not None:
+        columns = list(dict.fromkeys(("run", "ticker", *columns)))
+    frames = []
+    for path in snapshot_files(root, since):
+        if path.endswith(".parquet"):
+            filters = [("ticker", "in", list(tickers))] if tickers else None
+            try:
+                df = pd.read_parquet(path, columns=columns, filters=filters)
+            except ImportError:
+                raise ExportError("Renditeverlauf im Parquet-Format benötigt pyarrow (pip install pyarrow).") from None
+        else:
+            df = pd.read_csv(path, usecols=columns)
+            if tickers:
+                df = df[df["ticker"].isin(list(tickers))]
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=columns or DATASET_COLUMNS)
+    df = pd.concat(frames, ignore_index=True)
+    df["run"] = pd.to_datetime(df["run"])
+    return df
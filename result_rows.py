@@ -0,0 +1,91 @@
+# ───────────────────────────────────────────────────────────────
+# Ergebniszeilen, Anzeigeformat und Snapshot der letzten Analyse
+# Bewusst ohne pandas/yfinance, damit die Tk-App sofort starten kann
+# ───────────────────────────────────────────────────────────────
+import datetime
+import json
+import os
+
+SNAPSHOT_FILE = "last_results.json"
+
+ROW_FIELDS = ("ticker", "symbol", "name", "currency", "price_eur",
+              "dividend_eur", "yield_pct", "override", "error", "time")
+DISPLAY_COLUMNS = ("Unternehmen", "Ticker", "Kurs (€)", "Jahresdividende (€)",
+                   "Dividendenrendite (%)", "Stand")
+# Spalte → Feld von ResultRow; die Beträge sind float (None = unbekannt)
+COLUMN_FIELDS = {
+    "Unternehmen":           "name",
+    "Ticker":                "ticker",
+    "Kurs (€)":              "price_eur",
+    "Jahresdividende (€)":   "dividend_eur",
+    "Dividendenrendite (%)": "yield_pct",
+    "Stand":                 "time",
+}
+NUMERIC_COLUMNS = ("Kurs (€)", "Jahresdividende (€)", "Dividendenrendite (%)")
+
+
+class ResultRow:
+    """Ergebniszeile eines Tickers; formatiert wird erst bei der Anzeige."""
+
+    __slots__ = ROW_FIELDS
+
+    def __init__(self, **values):
+        for field in ROW_FIELDS:
+            setattr(self, field, values.get(field))
+
+    @property
+    def has_error(self):
+        return bool(self.error) and self.price_eur is None
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in ROW_FIELDS}
+
+    def __repr__(self):
+        return f"ResultRow({self.as_dict()!r})"
+
+
+# ───────── Anzeige ────────────────────────────────────────────
+def fmt_eur(value):
+    return f"€ {value:,.2f}" if value else "N/A"
+
+def fmt_pct(value):
+    return f"{value:.2f}" if value is not None else "N/A"
+
+def format_row(row):
+    """ResultRow → formatierte Anzeigespalten der Oberflächen."""
+    return {
+        "Unternehmen":           row.name,
+        "Ticker":                row.ticker,
+        "Kurs (€)":              fmt_eur(row.price_eur),
+        "Jahresdividende (€)":   fmt_eur(row.dividend_eur),
+        "Dividendenrendite (%)": fmt_pct(row.yield_pct),
+        "Stand":                 row.time,
+    }
+
+
+# ───────── Snapshot ───────────────────────────────────────────
+def save_snapshot(rows, path=SNAPSHOT_FILE):
+    """Zeilen kompakt (Feldliste + Wertelisten) speichern; atomar ersetzt."""
+    data = {
+        "saved": datetime.datetime.now().isoformat(timespec="seconds"),
+        "fields": ROW_FIELDS,
+        "rows": [[getattr(r, f) for f in ROW_FIELDS] for r in rows],
+    }
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Snapshot nicht gespeichert: {e}")
+
+def load_snapshot(path=SNAPSHOT_FILE):
+    """(Zeitpunkt, Zeilen) des letzten Snapshots oder (None, [])."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        saved = datetime.datetime.fromisoformat(data["saved"])
+        rows = [ResultRow(**dict(zip(data["fields"], values))) for values in data["rows"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, []
+    return saved, rows
@@ -0,0 +1,136 @@
+# ───────────────────────────────────────────────────────────────
+# Universum-Screener: die K renditestärksten Titel einer Symboldatei
+# Streamt die Datei durch die Engine, hält nur einen Top-K-Heap im
+# Speicher und meldet nach jedem Block eine Zwischenrangliste.
+#
+#   python screener.py universum.txt -k 50 --min-yield 4
+#   python screener.py universum.txt --suffix .DE .AS US --currency EUR USD --format csv
+# ───────────────────────────────────────────────────────────────
+import argparse
+import csv
+import heapq
+import itertools
+import json
+import sys
+
+from dividend_engine import (MAX_WORKERS, ROW_FIELDS, derive, find_override,
+                             iter_raw, iter_tickers, load_overrides, resolve_tickers)
+
+TOP_K = 50
+REPORT_EVERY = 100   # Zwischenrangliste nach so vielen fertigen Tickern
+
+
+def exchange_suffix(ticker):
+    """Börsensuffix wie ".DE"; Ticker ohne Suffix gelten als "US"."""
+    dot = ticker.rfind(".")
+    return ticker[dot:].upper() if dot > 0 else "US"
+
+
+class TopK:
+    """Die `k` Zeilen mit der höchsten Rendite (Min-Heap, Speicher O(k))."""
+
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self._heap = []              # (Rendite, laufende Nr., Zeile, Rohdaten)
+        self._seq = itertools.count()
+
+    def push(self, row, raw=None):
+        entry = (row.yield_pct, next(self._seq), row, raw)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    @property
+    def threshold(self):
+        """Rendite, die ein neuer Titel übertreffen muss (None, solange noch Plätze frei sind)."""
+        return self._heap[0][0] if len(self._heap) >= self.k else None
+
+    def rows(self):
+        return [e[2] for e in sorted(self._heap, key=lambda e: (-e[0], e[1]))]
+
+    def raws(self):
+        return {e[2].ticker: e[3] for e in self._heap if e[3] is not None}
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class ScreenProgress:
+    """Zwischenstand: gescannt, Treffer, Fehler und die aktuelle Rangliste."""
+
+    __slots__ = ("scanned", "matched", "errors", "leaders", "done")
+
+    def __init__(self, scanned, matched, errors, leaders, done=False):
+        self.scanned = scanned
+        self.matched = matched
+        self.errors = errors
+        self.leaders = leaders
+        self.done = done
+
+
+def screen(symbols, k=TOP_K, min_yield=None, currencies=None, suffixes=None,
+           overrides=None, workers=MAX_WORKERS, report_every=REPORT_EVERY, top=None):
+    """Screening als Generator von ScreenProgress (letzter Eintrag mit done=True).
+
+    `symbols` wird gestreamt; der Suffix-Filter greift vor dem Abruf, Mindest-
+    rendite und Währung danach. `top` erlaubt, einen eigenen TopK mitzugeben,
+    etwa um dessen Rohdaten später weiterzuverwenden.
+    """
+    top = top if top is not None else TopK(k)
+    suffixes = {s.upper() for s in suffixes} if suffixes else None
+    currencies = {c.upper() for c in currencies} if currencies else None
+    wanted = (t for t in symbols if suffixes is None or exchange_suffix(t) in suffixes)
+
+    scanned = matched = errors = 0
+    for raw in iter_raw(wanted, workers=workers):
+        scanned += 1
+        row = derive(raw, find_override(overrides, raw))
+        if row.has_error:
+            errors += 1
+        elif (row.yield_pct is not None
+              and (min_yield is None or row.yield_pct >= min_yield)
+              and (currencies is None or (row.currency or "").upper() in currencies)):
+            matched += 1
+            top.push(row, raw)
+        if scanned % report_every == 0:
+            yield ScreenProgress(scanned, matched, errors, top.rows())
+    yield ScreenProgress(scanned, matched, errors, top.rows(), done=True)
+
+
+# ───────── Kommandozeile ──────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Die renditestärksten Titel eines Symbol-Universums finden.")
+    parser.add_argument("file", help="Symboldatei ('-' = Standardeingabe)")
+    parser.add_argument("-k", "--top", type=int, default=TOP_K)
+    parser.add_argument("--min-yield", type=float, help="Mindestrendite in %%")
+    parser.add_argument("--currency", nargs="+", help="nur diese Währungen, z.B. EUR USD")
+    parser.add_argument("--suffix", nargs="+", help="nur diese Börsen, z.B. .DE .AS US")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    parser.add_argument("-w", "--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.file == "-" else open(args.file, "r", encoding="utf-8")
+    try:
+        for progress in screen(resolve_tickers(iter_tickers(source)), args.top, args.min_yield, args.currency,
+                               args.suffix, load_overrides(), args.workers):
+            best = progress.leaders[0] if progress.leaders else None
+            print(f"\r{progress.scanned} gescannt, {progress.matched} Treffer, {progress.errors} Fehler"
+                  + (f" – Spitze: {best.ticker} {best.yield_pct:.2f} %" if best else ""),
+                  end="", file=sys.stderr, flush=True)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    print(file=sys.stderr)
+
+    if args.format == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=ROW_FIELDS)
+        writer.writeheader()
+        for row in progress.leaders:
+            writer.writerow(row.as_dict())
+    else:
+        for row in progress.leaders:
+            print(json.dumps(row.as_dict(), ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
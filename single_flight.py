@@ -0,0 +1,88 @@
+# ───────────────────────────────────────────────────────────────
+# Single-Flight: gleichzeitige Abrufe desselben Schlüssels bündeln
+# Streamlit-Sitzungen laufen als Threads eines Prozesses; fragen mehrere
+# gleichzeitig denselben Ticker an, geht nur ein Abruf an Yahoo, die
+# übrigen warten auf dessen Ergebnis.
+# ───────────────────────────────────────────────────────────────
+import threading
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Pro Schlüssel höchstens ein laufender Abruf im Prozess."""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fetch):
+        """`fetch()` ausführen – oder auf den bereits laufenden Abruf warten.
+
+        Wartende erhalten dasselbe Ergebnis bzw. dieselbe Ausnahme.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = fetch()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def claim(self, keys):
+        """Für Bulk-Abrufe: teilt `keys` in (eigene Schlüssel, fremde Abrufe).
+
+        Eigene Schlüssel lädt der Aufrufer selbst und gibt sie danach mit
+        release() frei; auf die fremden wartet er mit wait().
+        """
+        mine, others = [], []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                flight = self._flights.get(key)
+                if flight is None:
+                    self._flights[key] = _Flight()
+                    mine.append(key)
+                else:
+                    others.append(flight)
+        return mine, others
+
+    def release(self, keys, results=None):
+        """Eigene Schlüssel freigeben; Wartende aus do() erhalten `results[key]`.
+
+        Ohne Ergebnis für einen Schlüssel bekommen sie None und laden selbst.
+        """
+        results = results or {}
+        with self._lock:
+            flights = [(key, self._flights.pop(key)) for key in keys if key in self._flights]
+        for key, flight in flights:
+            flight.result = results.get(key)
+            flight.done.set()
+
+    @staticmethod
+    def wait(flights, timeout=None):
+        for flight in flights:
+            flight.done.wait(timeout)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._flights)
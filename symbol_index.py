@@ -0,0 +1,204 @@
+# ───────────────────────────────────────────────────────────────
+# Offline-Symbolindex: WKN / ISIN / Name / Alias / Ticker → Yahoo-Ticker
+# Sortierte Textdatei (eine Zeile je Schlüssel), per Memory-Map gelesen
+# und binär durchsucht – kein Einlesen beim Start, auch bei 100k+ Titeln.
+#
+#   python symbol_index.py build instrumente.csv     # → symbol_index.dat
+#   python symbol_index.py search ALLIANZ
+#
+# CSV (Trennzeichen ';'): ticker;isin;wkn;name;aliases (Aliasse durch Leerzeichen)
+# Aliasse dürfen keine gültigen Yahoo-Ticker sein (z.B. nicht "SAP" für
+# SAP.DE) – resolve() übernähme sonst statt des US-Titels die Aliasquelle.
+# ───────────────────────────────────────────────────────────────
+import argparse
+import csv
+import mmap
+import os
+import threading
+import unicodedata
+
+SYMBOL_CSV = "symbols.csv"
+INDEX_FILE = "symbol_index.dat"
+
+# Schlüsselarten in der Indexdatei
+KIND_NAMES = {"T": "Ticker", "W": "WKN", "I": "ISIN", "N": "Name", "A": "Alias"}
+
+
+def normalize(text):
+    """Suchschlüssel: Großbuchstaben, ohne Akzente, einfache Leerzeichen."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.upper().replace("\t", " ").split())
+
+def looks_like_wkn(text):
+    return len(text) == 6 and text.isalnum() and "." not in text
+
+def looks_like_isin(text):
+    return len(text) == 12 and text[:2].isalpha() and text[2:].isalnum()
+
+
+# ───────── Aufbau ─────────────────────────────────────────────
+def _index_lines(rows):
+    for row in rows:
+        ticker = normalize(row.get("ticker"))
+        if not ticker:
+            continue
+        name = " ".join((row.get("name") or "").split())
+        # Nur die Ticker-Zeile trägt den Namen; alle anderen verweisen auf sie
+        yield f"{ticker}\tT\t{ticker}\t{name}"
+        for kind, field in (("W", "wkn"), ("I", "isin"), ("N", "name")):
+            key = normalize(row.get(field))
+            if key:
+                yield f"{key}\t{kind}\t{ticker}"
+        for alias in (row.get("aliases") or "").split():
+            yield f"{normalize(alias)}\tA\t{ticker}"
+
+def build_index(rows, path=INDEX_FILE):
+    """Indexdatei aus Zeilen (Dicts mit ticker/isin/wkn/name/aliases) schreiben; atomar ersetzt."""
+    lines = sorted(set(_index_lines(rows)), key=lambda line: line.encode("utf-8"))
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+        for line in lines:
+            f.write(line + "\n")
+    os.replace(tmp, path)
+    return len(lines)
+
+def read_csv(path):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        yield from csv.DictReader(f, delimiter=";")
+
+
+# ───────── Suche ──────────────────────────────────────────────
+class SymbolIndex:
+    """Präfixsuche auf der sortierten Indexdatei (Memory-Map, erst beim ersten Zugriff)."""
+
+    def __init__(self, path=INDEX_FILE, source=SYMBOL_CSV):
+        self.path = path
+        self.source = source
+        self._mm = None
+        self._lock = threading.Lock()
+
+    def _map(self):
+        if self._mm is None:
+            with self._lock:
+                if self._mm is None:
+                    self._mm = self._open()
+        return self._mm
+
+    def _open(self):
+        # Fehlt der Index (oder ist die Quelle neuer), aus der CSV bauen
+        if os.path.exists(self.source) and (
+                not os.path.exists(self.path)
+                or os.path.getmtime(self.source) > os.path.getmtime(self.path)):
+            build_index(read_csv(self.source), self.path)
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return b""
+        with open(self.path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _lower_bound(self, key):
+        """Anfang der ersten Zeile mit Schlüssel >= key."""
+        mm = self._map()
+        lo, hi = 0, len(mm)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mm.rfind(b"\n", 0, mid) + 1
+            end = mm.find(b"\n", start)
+            if mm[start:end] < key:
+                lo = end + 1
+            else:
+                hi = start
+        return lo
+
+    def _scan(self, key):
+        """Alle Zeilen, deren Schlüssel mit `key` beginnt (als Feldlisten)."""
+        mm = self._map()
+        pos = self._lower_bound(key)
+        while pos < len(mm):
+            end = mm.find(b"\n", pos)
+            line = mm[pos:end]
+            if not line.startswith(key):
+                return
+            yield line.decode("utf-8").split("\t")
+            pos = end + 1
+
+    def name_of(self, ticker):
+        key = normalize(ticker).encode("utf-8")
+        for fields in self._scan(key + b"\tT\t"):
+            return fields[3] if len(fields) > 3 else ""
+        return None
+
+    def lookup(self, text, kinds=None):
+        """Exakter Treffer → Yahoo-Ticker (oder None)."""
+        key = normalize(text).encode("utf-8") + b"\t"
+        for fields in self._scan(key):
+            if kinds is None or fields[1] in kinds:
+                return fields[2]
+        return None
+
+    def prefix(self, text, limit=10, kinds=None):
+        """Bis zu `limit` Titel, deren WKN/ISIN/Name/Alias/Ticker mit `text` beginnt.
+
+        Liefert Dicts (ticker, name, kind, key), je Ticker höchstens einmal.
+        """
+        key = normalize(text)
+        if not key:
+            return []
+        seen, out = set(), []
+        for fields in self._scan(key.encode("utf-8")):
+            ticker = fields[2]
+            if ticker in seen or (kinds and fields[1] not in kinds):
+                continue
+            seen.add(ticker)
+            name = fields[3] if fields[1] == "T" and len(fields) > 3 else self.name_of(ticker)
+            out.append({"ticker": ticker, "name": name, "kind": KIND_NAMES.get(fields[1], fields[1]),
+                        "key": fields[0]})
+            if len(out) >= limit:
+                break
+        return out
+
+    def resolve(self, text):
+        """Eingabe → Yahoo-Ticker.
+
+        Treffer im Index gewinnen – ein Ticker vor WKN, ISIN und Alias; sonst
+        wird die Eingabe als Ticker übernommen. Sieht sie wie eine WKN/ISIN
+        aus und ist nicht bekannt, kommt None zurück.
+        """
+        text = normalize(text)
+        if not text:
+            return None
+        hits = {}
+        for fields in self._scan(text.encode("utf-8") + b"\t"):
+            hits.setdefault(fields[1], fields[2])
+        for kind in ("T", "W", "I", "A"):
+            if kind in hits:
+                return hits[kind]
+        if looks_like_wkn(text) or looks_like_isin(text):
+            return None
+        return text
+
+
+# Gemeinsamer Index für Tk-App und Streamlit-App
+SYMBOLS = SymbolIndex()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline-Symbolindex bauen und durchsuchen.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="Index aus einer CSV (ticker;isin;wkn;name;aliases) bauen")
+    b.add_argument("csv", nargs="?", default=SYMBOL_CSV)
+    b.add_argument("-o", "--output", default=INDEX_FILE)
+    s = sub.add_parser("search", help="Präfixsuche")
+    s.add_argument("text")
+    s.add_argument("-n", "--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        n = build_index(read_csv(args.csv), args.output)
+        print(f"{n} Schlüssel → {args.output}")
+        return
+    for hit in SYMBOLS.prefix(args.text, args.limit):
+        print(f"{hit['ticker']:<12} {hit['kind']:<6} {hit['key']:<24} {hit['name']}")
+
+if __name__ == "__main__":
+    main()
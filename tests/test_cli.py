@@ -0,0 +1,24 @@
+import dividend_engine
+from result_rows import ResultRow
+
+
+def _fake_rows(tickers, overrides=None, workers=None):
+    for ticker in tickers:
+        yield ResultRow(ticker=ticker, symbol=ticker, name=ticker, currency="EUR",
+                        price_eur=10.0, dividend_eur=0.5, yield_pct=5.0, override=False, time="10:00:00")
+
+
+def test_output_file_keeps_stdout_empty(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(dividend_engine, "iter_rows", _fake_rows)
+    out = tmp_path / "out.csv"
+    dividend_engine.main(["ALV.DE", "O", "--format", "csv", "-o", str(out),
+                          "--overrides", str(tmp_path / "ovr.json")])
+    assert capsys.readouterr().out == ""
+    assert out.read_text(encoding="utf-8-sig").count("\n") == 3
+
+
+def test_stdout_csv_has_header_and_rows(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(dividend_engine, "iter_rows", _fake_rows)
+    dividend_engine.main(["ALV.DE", "--format", "csv", "--overrides", str(tmp_path / "ovr.json")])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("ticker,symbol,name") and lines[1].startswith("ALV.DE,")
@@ -0,0 +1,46 @@
+import types
+
+import pandas as pd
+
+import dividend_engine
+from dividend_engine import derive, fetch_raw
+from rate_limiter import BreakerOpen
+
+
+def _raw(**values):
+    raw = {"ticker": "O", "symbol": "O", "name": "Realty Income", "currency": "USD", "unit": 1.0,
+           "price": 50.0, "div_rate": 3.0, "div_yield": None, "div_history": None,
+           "error": None, "time": "10:00:00"}
+    raw.update(values)
+    return raw
+
+
+def test_converts_price_and_dividend_to_eur():
+    row = derive(_raw(), fx_rate=0.5)
+    assert (row.price_eur, row.dividend_eur) == (25.0, 1.5)
+    assert row.yield_pct == 6.0
+
+
+def test_unknown_currency_gives_no_eur_amounts():
+    row = derive(_raw(currency=None, div_rate=None, div_history=153.0,
+                      error="Keine Stammdaten (Währung unbekannt)"))
+    assert row.price_eur is None and row.dividend_eur is None and row.yield_pct is None
+    assert row.has_error
+
+
+def test_override_applies_even_without_currency():
+    row = derive(_raw(currency=None), override=2.0)
+    assert row.dividend_eur == 2.0 and row.price_eur is None
+
+
+def test_fetch_raw_without_metadata_keeps_currency_unknown(monkeypatch):
+    def get_info(ticker, fetch, fetch_quote=None):
+        raise BreakerOpen("Yahoo-Abrufe pausiert (info)")
+
+    monkeypatch.setattr(dividend_engine, "INFO_CACHE", types.SimpleNamespace(get_info=get_info))
+    close = pd.Series([2950.0], index=pd.to_datetime(["2024-05-17"]))
+    raw = fetch_raw("IMB.L", close=close, dividends=pd.Series([153.0]))
+    assert raw["currency"] is None and raw["price"] == 2950.0
+    assert raw["div_history"] is None
+    row = derive(raw)
+    assert row.price_eur is None and row.dividend_eur is None
@@ -0,0 +1,62 @@
+import pytest
+
+import dividend_engine
+import symbol_index
+from dividend_engine import find_override, raws_for_overrides
+from override_store import OverrideStore, OverrideValues
+from symbol_index import SymbolIndex, build_index
+
+
+@pytest.fixture(autouse=True)
+def symbols(tmp_path, monkeypatch):
+    path = str(tmp_path / "symbol_index.dat")
+    build_index([{"ticker": "SAP.DE", "isin": "DE0007164600", "wkn": "716460",
+                  "name": "SAP SE", "aliases": ""}], path)
+    index = SymbolIndex(path, source=str(tmp_path / "fehlt.csv"))
+    monkeypatch.setattr(dividend_engine, "SYMBOLS", index)
+    monkeypatch.setattr(symbol_index, "SYMBOLS", index)
+    return index
+
+
+SAP = {"ticker": "SAP.DE", "symbol": "SAP.DE"}
+REALTY = {"ticker": "899744", "symbol": "O"}
+
+
+def test_direct_keys_win():
+    assert find_override({"SAP.DE": 2.2, "716460": 9.9}, SAP) == 2.2
+    assert find_override({"O": 3.1}, REALTY) == 3.1
+    assert find_override({}, SAP) is None
+
+
+def test_wkn_isin_and_case_keys_match_via_symbol_index():
+    assert find_override({"716460": 2.2}, SAP) == 2.2
+    assert find_override({"de0007164600": 2.3}, SAP) == 2.3
+    assert find_override({"sap.de": 2.4}, SAP) == 2.4
+    assert find_override({"716460": 2.2}, REALTY) is None
+
+
+def test_raws_for_overrides_uses_the_same_matching():
+    raws = [SAP, REALTY, {"ticker": "MSFT", "symbol": "MSFT"}]
+    assert raws_for_overrides(raws, ["716460", "O"]) == [SAP, REALTY]
+    assert raws_for_overrides(raws, []) == []
+
+
+def test_keys_are_resolved_once_per_file_version(tmp_path, symbols, monkeypatch):
+    calls = []
+    resolve = symbols.resolve
+    monkeypatch.setattr(symbols, "resolve", lambda key: calls.append(key) or resolve(key))
+    store = OverrideStore(str(tmp_path / "dividend_overrides.json"))
+    store.update({"716460": 2.2, "O": 3.1})
+    values = store.values()
+    for _ in range(100):
+        assert find_override(values, SAP) == 2.2
+        assert find_override(store.values(), {"ticker": "MSFT", "symbol": "MSFT"}) is None
+    assert sorted(calls) == ["716460", "O"]
+    store.set("MSFT", 1.0)            # neuer Dateistand → neu auflösen
+    assert find_override(store.values(), SAP) == 2.2
+    assert len(calls) == 5
+
+
+def test_plain_dicts_are_accepted():
+    assert find_override(OverrideValues({"716460": 2.2}), SAP) == 2.2
+    assert find_override({"716460": 2.2}, SAP) == 2.2
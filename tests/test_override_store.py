@@ -0,0 +1,84 @@
+import json
+import multiprocessing
+import threading
+
+import pytest
+
+from override_store import OverrideStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "dividend_overrides.json")
+
+
+def _set_many(path, prefix, count):
+    store = OverrideStore(path)   # eigene Instanz wie eine zweite Sitzung/App
+    for i in range(count):
+        store.set(f"{prefix}{i}", i + 0.5)
+
+
+def test_set_and_clear_keep_history(path):
+    store = OverrideStore(path, history_limit=2)
+    store.set("SAP.DE", 2.2)
+    store.set("SAP.DE", 2.35)
+    store.set("SAP.DE", 2.35)      # unverändert → kein Eintrag
+    store.set("MSFT", 3)
+    assert dict(store.values()) == {"SAP.DE": 2.35, "MSFT": 3.0}
+    store.clear()
+    assert len(store) == 0
+    assert [v for _, v in store.history("SAP.DE")] == [2.35, None]
+    with pytest.raises(TypeError):
+        store.values()["X"] = 1.0  # schreibgeschützt
+
+
+def test_concurrent_threads_lose_no_update(path):
+    threads = [threading.Thread(target=_set_many, args=(path, f"T{n}-", 20)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(OverrideStore(path).values()) == 80
+
+
+def test_concurrent_processes_lose_no_update(path):
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_set_many, args=(path, f"P{n}-", 15)) for n in range(3)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(60)
+        assert proc.exitcode == 0
+    values = OverrideStore(path).values()
+    assert len(values) == 45
+    assert values["P2-14"] == 14.5
+
+
+def test_other_writer_is_seen_without_restart(path):
+    reader, writer = OverrideStore(path), OverrideStore(path)
+    assert reader.get("O") is None
+    writer.set("O", 3.1)
+    assert reader.get("O") == 3.1
+
+
+def test_corrupt_file_keeps_last_values_and_is_backed_up(path, capsys):
+    store = OverrideStore(path)
+    store.set("SAP.DE", 2.2)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"values": {"SAP.DE": ')   # halb geschrieben
+    assert dict(store.values()) == {"SAP.DE": 2.2}
+    store.set("MSFT", 3.0)
+    assert "gesichert" in capsys.readouterr().out
+    with open(f"{path}.corrupt", encoding="utf-8") as f:
+        assert f.read().startswith('{"values"')
+    assert dict(OverrideStore(path).values()) == {"SAP.DE": 2.2, "MSFT": 3.0}
+
+
+def test_legacy_flat_file_is_read(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"SAP.DE": 2.2, "ALT": None}, f)
+    store = OverrideStore(path)
+    assert dict(store.values()) == {"SAP.DE": 2.2}
+    store.set("MSFT", 3)
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["version"] == 2
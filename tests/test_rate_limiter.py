@@ -0,0 +1,99 @@
+import random
+import types
+
+import pytest
+
+import rate_limiter
+from rate_limiter import CircuitBreaker, TokenBucket, backoff_delay
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Steuerbare monotone Zeit für rate_limiter."""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter, "time", types.SimpleNamespace(
+        monotonic=lambda: now[0], sleep=lambda s: now.__setitem__(0, now[0] + s)))
+    return now
+
+
+def _trip(breaker, calls=4):
+    for _ in range(calls):
+        breaker.record(False, breaker.allow())
+
+
+def test_breaker_opens_at_threshold_after_min_calls(clock):
+    breaker = CircuitBreaker(threshold=0.5, window=4, min_calls=4, cooldown=10)
+    for ok in (True, False, True):
+        breaker.record(ok, breaker.allow())
+    assert not breaker.is_open
+    breaker.record(False, breaker.allow())
+    assert breaker.is_open
+    assert breaker.allow() is None
+
+
+def test_breaker_admits_one_probe_after_cooldown(clock):
+    breaker = CircuitBreaker(window=4, min_calls=4, cooldown=10)
+    _trip(breaker)
+    clock[0] += 9.9
+    assert breaker.allow() is None
+    clock[0] += 0.1
+    probe = breaker.allow()
+    assert probe is not None
+    assert breaker.allow() is None   # nur ein Probe-Aufruf
+    breaker.record(True, probe)
+    assert not breaker.is_open
+    assert breaker.allow() is not None
+
+
+def test_failed_probe_restarts_cooldown(clock):
+    breaker = CircuitBreaker(window=4, min_calls=4, cooldown=10)
+    _trip(breaker)
+    clock[0] += 10
+    breaker.record(False, breaker.allow())
+    assert breaker.is_open
+    clock[0] += 5
+    assert breaker.allow() is None
+    clock[0] += 5
+    assert breaker.allow() is not None
+
+
+def test_half_open_ignores_results_of_other_calls(clock):
+    breaker = CircuitBreaker(window=4, min_calls=4, cooldown=10)
+    early = breaker.allow()          # vor der Sperre gestartet, endet erst später
+    _trip(breaker)
+    clock[0] += 10
+    probe = breaker.allow()
+    breaker.record(True, early)
+    breaker.record(True)
+    assert breaker.is_open
+    assert breaker.allow() is None   # Probe läuft noch
+    breaker.record(False, probe)
+    assert breaker.is_open
+    clock[0] += 10
+    breaker.record(True, breaker.allow())
+    assert not breaker.is_open
+
+
+def test_reset_closes_breaker(clock):
+    breaker = CircuitBreaker(window=4, min_calls=4, cooldown=10)
+    _trip(breaker)
+    breaker.reset()
+    assert not breaker.is_open
+    assert breaker.allow() is not None
+
+
+def test_token_bucket_waits_for_refill(clock):
+    bucket = TokenBucket(rate=2, capacity=2)
+    start = clock[0]
+    for _ in range(4):
+        bucket.acquire()
+    assert bucket.acquired == 4
+    assert clock[0] - start == pytest.approx(1.0)
+    assert bucket.waited == pytest.approx(1.0)
+
+
+def test_backoff_delay_stays_within_cap():
+    rng = random.Random(0)
+    for attempt in range(10):
+        delay = backoff_delay(attempt, base=0.25, cap=4.0, rng=rng)
+        assert 0 <= delay <= min(4.0, 0.25 * 2 ** attempt)
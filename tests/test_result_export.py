@@ -0,0 +1,121 @@
+import csv
+import datetime
+import io
+import os
+
+import pytest
+
+from result_export import (CSV_DIALECTS, EXPORT_COLUMNS, ExportError, append_snapshot, export_rows,
+                           load_snapshots, open_export, snapshot_export)
+from result_rows import ResultRow
+
+ROWS = [
+    ResultRow(ticker="SAP.DE", symbol="SAP.DE", name="SAP SE; Walldorf", currency="EUR",
+              price_eur=178.34, dividend_eur=2.2, yield_pct=1.2336, override=False,
+              error=None, time="10:15:00"),
+    ResultRow(ticker="O", symbol="O", name='Realty "Income"', currency="USD",
+              price_eur=None, dividend_eur=None, yield_pct=None, override=True,
+              error="kein Kurs", time="10:15:01"),
+]
+
+
+def _read_csv(data, dialect):
+    sep, decimal = CSV_DIALECTS[dialect]
+    rows = list(csv.reader(io.StringIO(data.decode("utf-8-sig"), newline=""), delimiter=sep))
+    return rows[0], [dict(zip(rows[0], r)) for r in rows[1:]], decimal
+
+
+@pytest.mark.parametrize("dialect", sorted(CSV_DIALECTS))
+def test_csv_dialect_round_trip(dialect):
+    out = io.BytesIO()
+    assert export_rows(ROWS, out, fmt="csv", dialect=dialect) == 2
+    header, rows, decimal = _read_csv(out.getvalue(), dialect)
+    assert header == list(EXPORT_COLUMNS)
+    sap, realty = rows
+    assert sap["Unternehmen"] == "SAP SE; Walldorf"       # Trennzeichen im Text bleibt erhalten
+    assert float(sap["Kurs (€)"].replace(decimal, ".")) == 178.34
+    assert float(sap["Dividendenrendite (%)"].replace(decimal, ".")) == 1.2336
+    assert realty["Unternehmen"] == 'Realty "Income"'
+    assert realty["Kurs (€)"] == ""                       # None → leere Zelle
+    assert (sap["Override"], realty["Override"]) == ("False", "True")
+    assert (sap["Fehler"], realty["Fehler"]) == ("False", "True")
+
+
+def test_german_dialect_is_excel_friendly():
+    out = io.BytesIO()
+    export_rows(ROWS[:1], out, fmt="csv", dialect="de")
+    data = out.getvalue()
+    assert data.startswith(b"\xef\xbb\xbf")               # BOM für Excel
+    assert b";178,34;" in data
+
+
+def test_small_chunks_write_all_rows(tmp_path):
+    path = tmp_path / "export.csv"
+    with open_export(str(path), dialect="en", chunk=1) as out:
+        out.add_all(ROWS * 3)
+    assert out.rows == 6
+    assert len(_read_csv(path.read_bytes(), "en")[1]) == 6
+
+
+def test_discard_leaves_no_file(tmp_path):
+    path = tmp_path / "export.csv"
+    out = open_export(str(path))
+    out.add_all(ROWS)
+    out.discard()
+    assert os.listdir(tmp_path) == []
+
+
+def test_failed_export_leaves_no_file(tmp_path):
+    path = tmp_path / "export.csv"
+    with pytest.raises(RuntimeError):
+        with open_export(str(path)) as out:
+            out.add(ROWS[0])
+            raise RuntimeError("Abbruch")
+    assert os.listdir(tmp_path) == []
+
+
+def test_snapshot_csv_round_trip(tmp_path):
+    when = datetime.datetime(2024, 5, 17, 9, 30)
+    root = str(tmp_path / "yield_history")
+    with snapshot_export(root, when, fmt="csv") as out:   # ohne pyarrow der Standard
+        out.add_all(ROWS)
+    df = load_snapshots(root, tickers=["SAP.DE"])
+    assert list(df["ticker"]) == ["SAP.DE"]
+    assert df["yield_pct"].iloc[0] == 1.2336
+    assert df["run"].iloc[0] == when
+
+
+def test_parquet_discard_closes_writer(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "export.parquet"
+    out = open_export(str(path))
+    out.add_all(ROWS)
+    out.flush()
+    out.discard()
+    assert os.listdir(tmp_path) == []
+    append_snapshot(ROWS, str(tmp_path / "yield_history"), datetime.datetime(2024, 5, 17))
+    assert len(load_snapshots(str(tmp_path / "yield_history"))) == 2
+
+
+def test_missing_optional_package_raises_export_error(monkeypatch, tmp_path):
+    import builtins
+    real_import = builtins.__import__
+
+    def no_openpyxl(name, *args, **kwargs):
+        if name.startswith("openpyxl"):
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", no_openpyxl)
+    with pytest.raises(ExportError, match="openpyxl"):
+        open_export(str(tmp_path / "export.xlsx"))
+    assert os.listdir(tmp_path) == []
+
+
+def test_load_snapshots_reads_bounded_window_and_columns(tmp_path):
+    root = str(tmp_path / "yield_history")
+    for day in (1, 15, 20):
+        append_snapshot(ROWS, root, datetime.datetime(2024, 5, day, 9, 30))
+    df = load_snapshots(root, since=datetime.date(2024, 5, 15), columns=("yield_pct",))
+    assert list(df.columns) == ["run", "ticker", "yield_pct"]
+    assert sorted(df["run"].dt.day.unique()) == [15, 20]
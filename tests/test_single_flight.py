@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def _start(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def _wait_in_flight(flights, count, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while flights.in_flight() < count:
+        assert time.monotonic() < deadline, "Abruf startet nicht"
+        time.sleep(0.001)
+
+
+def test_concurrent_callers_share_one_fetch():
+    flights, gate, calls, results = SingleFlight(), threading.Event(), [], []
+
+    def fetch():
+        calls.append(1)
+        gate.wait(2)
+        return "info"
+
+    threads = [_start(lambda: results.append(flights.do("SAP.DE", fetch))) for _ in range(5)]
+    _wait_in_flight(flights, 1)
+    time.sleep(0.1)    # die übrigen Aufrufer warten inzwischen
+    gate.set()
+    for thread in threads:
+        thread.join(2)
+    assert calls == [1]
+    assert results == ["info"] * 5
+    assert flights.in_flight() == 0
+
+
+def test_waiters_receive_the_leaders_exception():
+    flights, gate, errors = SingleFlight(), threading.Event(), []
+
+    def fetch():
+        gate.wait(2)
+        raise ValueError("Yahoo")
+
+    def call():
+        try:
+            flights.do("MSFT", fetch)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [_start(call) for _ in range(3)]
+    _wait_in_flight(flights, 1)
+    time.sleep(0.1)
+    gate.set()
+    for thread in threads:
+        thread.join(2)
+    assert errors == ["Yahoo"] * 3
+    assert flights.in_flight() == 0
+
+
+def test_different_keys_fetch_independently():
+    flights = SingleFlight()
+    assert flights.do("A", lambda: 1) == 1
+    assert flights.do("B", lambda: 2) == 2
+    with pytest.raises(KeyError):
+        flights.do("C", lambda: {}["x"])
+    assert flights.do("C", lambda: 3) == 3   # Fehler wird nicht zwischengespeichert
+
+
+def test_claim_splits_own_and_foreign_keys():
+    flights = SingleFlight()
+    mine, others = flights.claim(["A", "B", "A"])
+    assert mine == ["A", "B"] and others == []
+    mine2, others2 = flights.claim(["B", "C"])
+    assert mine2 == ["C"] and len(others2) == 1
+    flights.release(mine)
+    flights.wait(others2, timeout=1)
+    assert others2[0].done.is_set()
+    flights.release(mine2)
+    assert flights.in_flight() == 0
+
+
+def test_release_hands_results_to_waiting_do_callers():
+    flights, results = SingleFlight(), {}
+    mine, _ = flights.claim(["A", "B"])
+    threads = [_start(lambda k=k: results.__setitem__(k, flights.do(k, lambda: "eigener Abruf")))
+               for k in ("A", "B")]
+    time.sleep(0.1)
+    flights.release(mine, {"A": "aus Sammelabruf"})
+    for thread in threads:
+        thread.join(2)
+    # A übernimmt das Ergebnis, B bekommt None und muss selbst laden
+    assert results == {"A": "aus Sammelabruf", "B": None}
+    assert flights.do("B", lambda: "eigener Abruf") == "eigener Abruf"
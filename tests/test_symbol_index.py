@@ -0,0 +1,77 @@
+import pytest
+
+from symbol_index import SymbolIndex, build_index, normalize
+
+ROWS = [
+    {"ticker": "SAP.DE", "isin": "DE0007164600", "wkn": "716460", "name": "SAP SE", "aliases": "SAP"},
+    {"ticker": "ALV.DE", "isin": "DE0008404005", "wkn": "840400", "name": "Allianz SE", "aliases": ""},
+    {"ticker": "MUV2.DE", "isin": "DE0008430026", "wkn": "843002", "name": "Münchener Rück", "aliases": "MUNICH-RE"},
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "symbol_index.dat"
+    build_index(ROWS, str(path))
+    return SymbolIndex(str(path), source=str(tmp_path / "fehlt.csv"))
+
+
+def test_normalize_strips_accents_case_and_spaces():
+    assert normalize("  münchener\trück ") == "MUNCHENER RUCK"
+    assert normalize(None) == ""
+
+
+def test_lookup_by_every_key_kind(index):
+    assert index.lookup("716460") == "SAP.DE"
+    assert index.lookup("de0008404005") == "ALV.DE"
+    assert index.lookup("Münchener Rück") == "MUV2.DE"
+    assert index.lookup("munich-re") == "MUV2.DE"
+    assert index.lookup("sap.de") == "SAP.DE"
+    assert index.lookup("Allianz") is None            # kein exakter Treffer
+    assert index.lookup("SAP SE", kinds=("W",)) is None
+
+
+def test_prefix_returns_each_ticker_once_with_name(index):
+    hits = index.prefix("DE000")
+    assert [h["ticker"] for h in hits] == ["SAP.DE", "ALV.DE", "MUV2.DE"]
+    assert all(h["kind"] == "ISIN" for h in hits)
+    assert index.prefix("allianz") == [
+        {"ticker": "ALV.DE", "name": "Allianz SE", "kind": "Name", "key": "ALLIANZ SE"}]
+    assert index.prefix("SAP", limit=1)[0]["ticker"] == "SAP.DE"
+    assert len(index.prefix("SAP")) == 1
+    assert index.prefix("") == []
+
+
+def test_resolve_falls_back_to_ticker_but_not_for_unknown_ids(index):
+    assert index.resolve("716460") == "SAP.DE"
+    assert index.resolve("msft") == "MSFT"            # unbekannt, aber als Ticker brauchbar
+    assert index.resolve("123456") is None            # unbekannte WKN
+    assert index.resolve("US0000000000") is None      # unbekannte ISIN
+    assert index.resolve("  ") is None
+
+
+def test_missing_index_is_built_from_csv(tmp_path):
+    source = tmp_path / "symbols.csv"
+    source.write_text("ticker;isin;wkn;name;aliases\nO;US7561091049;899744;Realty Income;\n",
+                      encoding="utf-8")
+    index = SymbolIndex(str(tmp_path / "symbol_index.dat"), source=str(source))
+    assert index.lookup("899744") == "O"
+    assert index.name_of("O") == "Realty Income"
+
+
+def test_empty_index_finds_nothing(tmp_path):
+    path = tmp_path / "leer.dat"
+    path.write_bytes(b"")
+    index = SymbolIndex(str(path), source=str(tmp_path / "fehlt.csv"))
+    assert index.lookup("SAP") is None
+    assert index.prefix("S") == []
+
+
+def test_ticker_wins_over_colliding_alias(tmp_path):
+    path = str(tmp_path / "symbol_index.dat")
+    build_index(ROWS + [{"ticker": "SAP", "isin": "US8030542042", "wkn": "", "name": "SAP SE ADR",
+                         "aliases": ""}], path)
+    index = SymbolIndex(path, source=str(tmp_path / "fehlt.csv"))
+    assert index.resolve("sap") == "SAP"
+    assert index.resolve("716460") == "SAP.DE"
+
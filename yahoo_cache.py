@@ -0,0 +1,219 @@
+# ───────────────────────────────────────────────────────────────
+# Persistenter Yahoo-Cache (SQLite)
+# Einträge je Ticker und Feldgruppe | eigene TTL je Gruppe |
+# bei Fehlern werden veraltete Daten statt nichts geliefert
+# ───────────────────────────────────────────────────────────────
+import json
+import sqlite3
+import threading
+import time
+
+from market_hours import settled_since
+from single_flight import SingleFlight
+
+CACHE_FILE = "yahoo_cache.sqlite"
+
+# Welche info-Felder zu welcher Gruppe gehören
+FIELD_GROUPS = {
+    "meta":     ("longName", "shortName", "symbol", "currency", "exchange", "quoteType"),
+    "dividend": ("trailingAnnualDividendRate", "dividendYield", "dividendRate"),
+    "quote":    ("regularMarketPrice", "currentPrice", "previousClose"),
+}
+
+# Ohne diese Angaben gilt ein Datensatz aus einem Sammelabruf als unvollständig
+REQUIRED_FIELDS = (("longName", "shortName"), ("currency",), ("regularMarketPrice", "currentPrice"))
+
+# Gültigkeit in Sekunden: Stammdaten selten, Kurse häufig
+GROUP_TTL = {
+    "meta":             7 * 24 * 3600,
+    "dividend":         24 * 3600,
+    "dividend_history": 24 * 3600,
+    "quote":            15 * 60,
+}
+
+
+def is_complete(info):
+    """Hat das info-Dict Name, Währung und Kurs?"""
+    return all(any(info.get(k) for k in keys) for keys in REQUIRED_FIELDS)
+
+
+class InfoCache:
+    """Thread-sicherer SQLite-Cache zwischen den Apps und yfinance."""
+
+    def __init__(self, path=CACHE_FILE, ttl=None):
+        self.path = path
+        self.ttl = dict(GROUP_TTL, **(ttl or {}))
+        self._conn = None
+        self._lock = threading.Lock()
+        # gleichzeitige Abrufe desselben Tickers (z.B. aus mehreren Sitzungen) bündeln
+        self._flights = SingleFlight()
+
+    def _db(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " ticker TEXT NOT NULL, grp TEXT NOT NULL,"
+                " payload TEXT NOT NULL, fetched REAL NOT NULL,"
+                " PRIMARY KEY (ticker, grp))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _read(self, ticker):
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT grp, payload, fetched FROM entries WHERE ticker = ?", (ticker,)
+            ).fetchall()
+        return {grp: (json.loads(payload), fetched) for grp, payload, fetched in rows}
+
+    def _read_many(self, tickers, chunk=500):
+        """Einträge vieler Ticker mit wenigen Abfragen: Ticker → {Gruppe: (Daten, Zeit)}."""
+        tickers = list(tickers)
+        out = {}
+        with self._lock:
+            for i in range(0, len(tickers), chunk):
+                part = tickers[i:i + chunk]
+                rows = self._db().execute(
+                    "SELECT ticker, grp, payload, fetched FROM entries"
+                    f" WHERE ticker IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                for ticker, grp, payload, fetched in rows:
+                    out.setdefault(ticker, {})[grp] = (json.loads(payload), fetched)
+        return out
+
+    def _write(self, ticker, groups):
+        now = time.time()
+        with self._lock:
+            self._db().executemany(
+                "INSERT OR REPLACE INTO entries (ticker, grp, payload, fetched) VALUES (?, ?, ?, ?)",
+                [(ticker, grp, json.dumps(payload), now) for grp, payload in groups.items()],
+            )
+
+    def _is_fresh(self, grp, entry, now, ticker=None):
+        if entry is None:
+            return False
+        if now - entry[1] < self.ttl.get(grp, 0):
+            return True
+        # Kurse einer geschlossenen Börse bleiben bis zur nächsten Sitzung gültig
+        return grp == "quote" and ticker is not None and settled_since(ticker, entry[1], now)
+
+    def _stale(self, ticker, entries, now):
+        return [g for g in FIELD_GROUPS if not self._is_fresh(g, entries.get(g), now, ticker)]
+
+    def get_info(self, ticker, fetch, fetch_quote=None):
+        """Liefert ein info-Dict aus Cache und Netz.
+
+        `fetch()` lädt das komplette info-Dict. Ist nur die Kursgruppe
+        abgelaufen und `fetch_quote()` angegeben, wird nur diese erneuert.
+        Schlägt der Abruf fehl, werden vorhandene (auch veraltete) Daten
+        geliefert; ohne Cache-Eintrag wird der Fehler weitergereicht.
+        Gleichzeitige Aufrufe für denselben Ticker teilen sich einen Abruf.
+        """
+        entries = self._read(ticker)
+        stale = self._stale(ticker, entries, time.time())
+        merged = {}
+        for grp in FIELD_GROUPS:
+            if grp in entries:
+                merged.update(entries[grp][0])
+        if not stale:
+            return merged
+
+        quote_only = stale == ["quote"] and fetch_quote is not None
+        key = self._flight_key(ticker, stale, quote_only)
+        refresh = lambda: self._refresh(ticker, fetch_quote if quote_only else fetch, quote_only)
+        try:
+            groups = self._flights.do(key, refresh)
+            if groups is None:
+                # ein Sammelabruf hielt den Schlüssel, lieferte aber nichts Brauchbares
+                groups = self._flights.do(key, refresh)
+        except Exception:
+            if entries:
+                return merged
+            raise
+        for payload in (groups or {}).values():
+            merged.update(payload)
+        return merged
+
+    @staticmethod
+    def _flight_key(ticker, stale, quote_only=None):
+        """Single-Flight-Schlüssel eines Abrufs – gleich für get_info() und prefetch()."""
+        if quote_only is None:
+            quote_only = stale == ["quote"]
+        return (ticker, "quote" if quote_only else "info")
+
+    def prefetch(self, tickers, fetch_many, has_quote=()):
+        """info-Daten vieler Ticker vorab mit Sammelabrufen laden.
+
+        `fetch_many(ticker_liste)` liefert {Ticker: info-Dict} für viele
+        Ticker je Aufruf. Angefragt werden nur Ticker mit abgelaufenen
+        Stammdaten/Dividendenfeldern – oder abgelaufenem Kurs, sofern der
+        Ticker nicht in `has_quote` steht (dort kommt der Kurs aus der
+        Tageshistorie). Unvollständige Antworten werden nicht gespeichert;
+        für sie lädt get_info() anschließend das einzelne info-Dict.
+        Ticker, die gerade eine andere Sitzung lädt, werden abgewartet.
+        Liefert die Anzahl gespeicherter Ticker.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        entries = self._read_many(tickers)
+        now = time.time()
+        wanted = []
+        for t in tickers:
+            stale = self._stale(t, entries.get(t, {}), now)
+            if stale and not (stale == ["quote"] and t in has_quote):
+                wanted.append(self._flight_key(t, stale))
+        mine, others = self._flights.claim(wanted)
+        results = {}
+        try:
+            infos = fetch_many([t for t, _ in mine]) if mine else {}
+            for key in mine:
+                info = infos.get(key[0])
+                if info and is_complete(info):
+                    results[key] = self._refresh(key[0], lambda: info, False)
+        finally:
+            # wartende get_info()-Aufrufe übernehmen das Ergebnis (None = selbst laden)
+            self._flights.release(mine, results)
+        self._flights.wait(others)
+        return len(results)
+
+    def _refresh(self, ticker, fetch, quote_only):
+        """Netzabruf und Schreiben; liefert die neuen Gruppen ({} = nichts erhalten)."""
+        fresh = fetch() or {}
+        if not fresh:
+            return {}
+        if quote_only:
+            groups = {"quote": {k: v for k, v in fresh.items() if v is not None}}
+        else:
+            groups = {
+                grp: {k: fresh[k] for k in fields if fresh.get(k) is not None}
+                for grp, fields in FIELD_GROUPS.items()
+            }
+        self._write(ticker, groups)
+        return groups
+
+    def get_group(self, ticker, grp, fetch):
+        """Einzelner Wert mit eigener TTL, z.B. die Dividendensumme aus der Historie."""
+        entry = self._read(ticker).get(grp)
+        if self._is_fresh(grp, entry, time.time()):
+            return entry[0]
+
+        def refresh():
+            value = fetch()
+            self._write(ticker, {grp: value})
+            return value
+
+        try:
+            return self._flights.do((ticker, grp), refresh)
+        except Exception:
+            if entry is not None:
+                return entry[0]
+            raise
+
+    def clear(self):
+        with self._lock:
+            self._db().execute("DELETE FROM entries")
+
+
+# Gemeinsamer Cache für Tk-App und Streamlit-App
+INFO_CACHE = InfoCache()